@@ -1,12 +1,12 @@
 import hashlib
 import traceback
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 
 from app.core.config import settings
 from app.models.schemas import OCRResponse, OCRBatchResponse, OCRBatchItem
-from app.services.ocr_service import process_file
+from app.services.ocr_service import process_file, process_files
 
 
 router = APIRouter(prefix="/ocr", tags=["OCR"])
@@ -81,7 +81,9 @@ async def extract_batch(
 
     seen_names = set()
     seen_hashes = set()
-    results: List[OCRBatchItem] = []
+    results: List[Optional[OCRBatchItem]] = []
+    # unique files to OCR: (results index, filename, hash, contents)
+    pending: List[Tuple[int, str, str, bytes]] = []
 
     for f in files:
         filename = f.filename or "document"
@@ -129,24 +131,29 @@ async def extract_batch(
                 continue
             seen_hashes.add(h)
 
-            resp = process_file(contents, filename, document_type, zero_retention=zr)
+            pending.append((len(results), filename, h, contents))
+            results.append(None)
 
-            results.append(
-                OCRBatchItem(
-                    filename=filename,
-                    file_hash=h,
-                    skipped_duplicate=False,
-                    response=resp,
-                )
-            )
-
-        except ValueError as ve:
-            results.append(OCRBatchItem(filename=filename, file_hash="", error=f"bad_request: {ve}"))
-        except TimeoutError as te:
-            results.append(OCRBatchItem(filename=filename, file_hash="", error=f"timeout: {te}"))
         except Exception as e:
             results.append(OCRBatchItem(filename=filename, file_hash="", error=str(e)))
 
+    # OCR the unique files together (sharded across processes for multi-file batches)
+    outcomes = process_files([(contents, filename, document_type) for _, filename, _, contents in pending], zero_retention=zr)
+    for (idx, filename, h, _), resp in zip(pending, outcomes):
+        if isinstance(resp, ValueError):
+            results[idx] = OCRBatchItem(filename=filename, file_hash="", error=f"bad_request: {resp}")
+        elif isinstance(resp, TimeoutError):
+            results[idx] = OCRBatchItem(filename=filename, file_hash="", error=f"timeout: {resp}")
+        elif isinstance(resp, Exception):
+            results[idx] = OCRBatchItem(filename=filename, file_hash="", error=str(resp))
+        else:
+            results[idx] = OCRBatchItem(
+                filename=filename,
+                file_hash=h,
+                skipped_duplicate=False,
+                response=resp,
+            )
+
     return OCRBatchResponse(
         status="success",
         document_type=document_type,
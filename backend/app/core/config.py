@@ -62,6 +62,9 @@ class Settings(BaseSettings):
 
     ENGINE_TIMEOUT_DOCTR_S: int = Field(default=25, ge=1)
     ENGINE_TIMEOUT_TROCR_S: int = Field(default=25, ge=1)
+    # Load TrOCR in the background at startup instead of on first use
+    # (only when ENABLE_TROCR is on)
+    TROCR_WARMUP_ON_STARTUP: bool = Field(default=False)
     ORCH_MAX_TROCR_REGIONS: int = Field(default=12, ge=1)
     ORCH_MAX_DOCTR_PAGES: int = Field(default=6, ge=0)
     DOCTR_ONLY_IF_TABLE_CANDIDATE: bool = Field(default=True)
@@ -69,9 +72,22 @@ class Settings(BaseSettings):
     # Batch limits
     MAX_DOCS_PER_BATCH: int = Field(default=10, ge=1)
 
-    # PDF rendering (if you convert PDFs to images before OCR)
+    # Render resolution for PDF pages without a text layer (OCR input); scans
+    # with a lower native resolution render at that instead (min 150)
     PDF_RENDER_DPI: int = Field(default=200, ge=72, le=600)
 
+    # Pages OCR'd concurrently (Tesseract runs out-of-process). 0 = CPU count.
+    OCR_CONCURRENCY: int = Field(default=0, ge=0)
+
+    # In-memory OCR results keyed by page-image hash (skipped for zero-retention
+    # requests). 0 disables.
+    OCR_CACHE_MAX_ENTRIES: int = Field(default=64, ge=0)
+
+    # Whole responses kept in memory by upload content hash, so re-uploads of
+    # the same file skip the pipeline (skipped for zero-retention requests).
+    # 0 disables.
+    OCR_RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=16, ge=0)
+
     # Retention behavior
     ZERO_RETENTION_DEFAULT: bool = Field(default=True)
 
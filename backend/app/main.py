@@ -1,3 +1,6 @@
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -5,8 +8,29 @@ from app.core.config import settings
 from app.api import ocr_routes
 
 
+def _warmup_trocr() -> None:
+    try:
+        from app.services.trocr_engine import warmup_trocr
+
+        warmup_trocr()
+    except Exception as e:
+        # optional engine: requests fall back to loading it lazily
+        print(f"[startup] TrOCR warmup failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # warm up in the background so the server starts accepting requests at once
+    if settings.ENABLE_TROCR and settings.TROCR_WARMUP_ON_STARTUP:
+        threading.Thread(target=_warmup_trocr, name="trocr-warmup", daemon=True).start()
+    yield
+    from app.services.ocr_service import shutdown_file_pool
+
+    shutdown_file_pool()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.PROJECT_NAME)
+    app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
     # CORS
     app.add_middleware(
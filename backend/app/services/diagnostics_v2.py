@@ -1,17 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Tuple, Union
 import math
 import numpy as np
 import cv2
 from PIL import Image
 
 
-def _pil_to_gray(img: Image.Image) -> np.ndarray:
+def _pil_to_gray(img: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    """Gray uint8 array; an already-decoded gray array is passed through as-is."""
+    if isinstance(img, np.ndarray):
+        return img
     return np.array(img.convert("L"))
 
 
-def estimate_noise_score(page_image: Image.Image) -> float:
+def estimate_noise_score(page_image: Union[Image.Image, np.ndarray]) -> float:
     """
     Rough noise score in [0,1]. Higher means noisier.
     Uses edge density + small connected components heuristic.
@@ -32,11 +35,8 @@ def estimate_noise_score(page_image: Image.Image) -> float:
                                    cv2.THRESH_BINARY_INV, 35, 10)
     num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(bin_inv, connectivity=8)
     # count small blobs (exclude background=0)
-    small = 0
-    for i in range(1, num_labels):
-        area = stats[i, cv2.CC_STAT_AREA]
-        if 5 <= area <= 40:
-            small += 1
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    small = int(np.count_nonzero((areas >= 5) & (areas <= 40)))
     small_density = small / float(gray.size / 10000.0 + 1e-6)  # per 10k px
 
     # combine
@@ -44,7 +44,7 @@ def estimate_noise_score(page_image: Image.Image) -> float:
     return float(max(0.0, min(1.0, score)))
 
 
-def estimate_skew_deg(page_image: Image.Image) -> float:
+def estimate_skew_deg(page_image: Union[Image.Image, np.ndarray]) -> float:
     """
     Estimate skew angle in degrees. Positive means clockwise.
     Uses minimum area rectangle over text pixels.
@@ -96,8 +96,10 @@ def script_profile(text: str) -> Dict[str, float]:
 
 
 def compute_page_diagnostics(page_image: Image.Image, page_text: str) -> Dict[str, Any]:
-    noise = estimate_noise_score(page_image)
-    skew = estimate_skew_deg(page_image)
+    # decode once, both estimators read the same gray array
+    gray = _pil_to_gray(page_image)
+    noise = estimate_noise_score(gray)
+    skew = estimate_skew_deg(gray)
     sp = script_profile(page_text)
 
     mixed = sum(1 for k,v in sp.items() if k not in ("other",) and v >= 0.15) >= 2
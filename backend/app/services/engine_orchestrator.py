@@ -1,12 +1,26 @@
-from paddleocr import PaddleOCR
+import functools
+
 from PIL import Image
 import numpy as np
 import cv2
 
 
+@functools.cache
+def _load_paddle_ocr():
+    """Import PaddleOCR on first use (pulls in paddle); None if unavailable."""
+    try:
+        from paddleocr import PaddleOCR
+        return PaddleOCR
+    except Exception:
+        return None
+
+
 class EngineOrchestrator:
 
     def __init__(self):
+        PaddleOCR = _load_paddle_ocr()
+        if PaddleOCR is None:
+            raise RuntimeError("paddleocr is not installed")
         self.ocr = PaddleOCR(
             use_angle_cls=True,
             lang="en",
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import html
 
 
@@ -62,14 +62,14 @@ def document_to_html(
     tables: Optional[List[Dict[str, Any]]] = None,
 ) -> str:
     """Simple HTML export: headings, paragraphs, lists, and extracted tables."""
-    tables_by_page_block: Dict[str, Dict[str, Any]] = {}
+    tables_by_page_block: Dict[Tuple[int, int], Dict[str, Any]] = {}
     if tables:
         for t in tables:
             pn = int(t.get("page_number") or 0)
             bi = t.get("source_block_index")
             if bi is None:
                 continue
-            tables_by_page_block[f"{pn}:{int(bi)}"] = t
+            tables_by_page_block[(pn, int(bi))] = t
 
     out: List[str] = []
     out.append("<div class='ocr-document'>")
@@ -77,9 +77,9 @@ def document_to_html(
         page_num = int(p.get("page_number") or p.get("page") or 0)
         out.append(f"<section class='ocr-page' data-page='{page_num}'>")
         for bi, b in enumerate(p.get('blocks', []) or []):
-            key = f"{page_num}:{bi}"
-            if key in tables_by_page_block:
-                out.append(_table_to_html(tables_by_page_block[key]))
+            table = tables_by_page_block.get((page_num, bi))
+            if table is not None:
+                out.append(_table_to_html(table))
                 continue
 
             btype = (b.get("type") or "paragraph").lower()
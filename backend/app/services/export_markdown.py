@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 
 def _table_to_markdown(table: Dict[str, Any]) -> str:
@@ -56,23 +56,23 @@ def document_to_markdown(
     """Render normalized document blocks to Markdown (predictable + table-aware)."""
     md_parts: List[str] = []
 
-    tables_by_page_block: Dict[str, Dict[str, Any]] = {}
+    tables_by_page_block: Dict[Tuple[int, int], Dict[str, Any]] = {}
     if tables:
         for t in tables:
             pn = int(t.get("page_number") or 0)
             bi = t.get("source_block_index")
             if bi is None:
                 continue
-            tables_by_page_block[f"{pn}:{int(bi)}"] = t
+            tables_by_page_block[(pn, int(bi))] = t
 
     for p in pages:
         page_num = int(p.get("page_number") or p.get("page") or 0)
         blocks = p.get("blocks", [])
         for bi, b in enumerate(blocks):
             # if we have an extracted table for this block, render it as markdown table
-            key = f"{page_num}:{bi}"
-            if key in tables_by_page_block:
-                md = _table_to_markdown(tables_by_page_block[key])
+            table = tables_by_page_block.get((page_num, bi))
+            if table is not None:
+                md = _table_to_markdown(table)
                 if md.strip():
                     md_parts.append(md)
                     continue
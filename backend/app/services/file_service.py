@@ -1,6 +1,8 @@
 import os
 import re
+import threading
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 from app.core.config import settings
 
@@ -8,6 +10,13 @@ from app.core.config import settings
 BASE_UPLOAD_DIR = Path(settings.UPLOAD_DIR)
 BASE_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# content hash of the upload last written to each path by this process, with
+# the (size, mtime_ns, inode) it had on disk right after the write; another
+# process (or worker) replacing the file changes the inode, so a stale entry
+# never matches
+_SAVED_HASHES: Dict[str, Tuple[str, int, int, int]] = {}
+_SAVED_HASHES_LOCK = threading.Lock()
+
 
 def sanitize_filename(filename: str) -> str:
     """
@@ -20,21 +29,69 @@ def sanitize_filename(filename: str) -> str:
     return name or "document"
 
 
-def save_unique_by_name(filename: str, file_bytes: bytes) -> str:
+def save_unique_by_name(filename: str, file_bytes: bytes, content_hash: Optional[str] = None) -> str:
     """
     Saves file to uploads/<filename>.
     If a file with the same name already exists, overwrite it
     so only ONE copy exists at all times.
+
+    The bytes go to a temp file in the same directory first and are then
+    swapped in with os.replace, so readers never see a half-written upload.
+
+    With content_hash, a re-upload of the same bytes under the same name
+    skips the write entirely, as long as the file on disk is still the one
+    this process wrote.
     """
     safe = sanitize_filename(filename)
     path = BASE_UPLOAD_DIR / safe
-    path.write_bytes(file_bytes)
+
+    if content_hash is not None:
+        with _SAVED_HASHES_LOCK:
+            saved = _SAVED_HASHES.get(safe)
+        if saved is not None and saved[0] == content_hash:
+            try:
+                st = path.stat()
+                if (st.st_size, st.st_mtime_ns, st.st_ino) == saved[1:]:
+                    return str(path)
+            except OSError:
+                pass  # removed behind our back: write it again
+    tmp = BASE_UPLOAD_DIR / f".{safe}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        if file_bytes and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, len(file_bytes))
+            except OSError:
+                pass  # not supported by every filesystem
+        view = memoryview(file_bytes)
+        while view:
+            n = os.write(fd, view)
+            view = view[n:]
+        os.close(fd)
+        fd = -1
+        os.replace(tmp, path)
+    except Exception:
+        # never leave the temp file behind (write error, cross-device or
+        # permission failure, Windows sharing violation on replace)
+        if fd >= 0:
+            os.close(fd)
+        tmp.unlink(missing_ok=True)
+        raise
+    st = os.stat(path) if content_hash is not None else None
+    with _SAVED_HASHES_LOCK:
+        if st is not None:
+            _SAVED_HASHES[safe] = (content_hash, st.st_size, st.st_mtime_ns, st.st_ino)
+        else:
+            _SAVED_HASHES.pop(safe, None)
     return str(path)
 
 
 def delete_if_exists(filename: str) -> None:
     safe = sanitize_filename(filename)
     path = BASE_UPLOAD_DIR / safe
+    with _SAVED_HASHES_LOCK:
+        _SAVED_HASHES.pop(safe, None)
     try:
         path.unlink(missing_ok=True)
     except Exception:
@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+import bisect
+import functools
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Tuple, Optional
 from PIL import Image
@@ -12,6 +18,16 @@ import numpy as np
 import pytesseract
 from typing import List, Dict, Any
 
+from app.services.tesseract_runtime import tesserocr, tesserocr_usable, thread_api
+
+_CHAR_WHITELIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+_STRIP_CONFIG = f"--psm 7 -c tessedit_char_whitelist={_CHAR_WHITELIST}"
+_STRIP_GAP = 24     # white gutter between tiled cells so Tesseract keeps them apart
+_STRIP_MARGIN = 10
+_ROW_WORKERS = min(4, os.cpu_count() or 1)
+_REGION_DETECT_MAX_SIDE = 1600
+_CELL_TARGET_PX = 64  # small cells are upscaled to this height before OCR
+
 @dataclass
 class BoxLineResult:
     text: str
@@ -20,53 +36,239 @@ class BoxLineResult:
     boxes: Optional[list] = None
 
 
-def _pil_to_bgr(img: Image.Image) -> np.ndarray:
-    arr = np.array(img.convert("RGB"))
-    return cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
+def _line_api():
+    """
+    Persistent single-line tesserocr API for the calling thread (model loaded
+    once per thread; a PyTessBaseAPI must not be shared across threads).
+    Returns None when tesserocr is missing or fails to init.
+    """
+    if tesserocr is None:
+        return None
+    return thread_api(
+        "line_api",
+        variables={"tessedit_char_whitelist": _CHAR_WHITELIST},
+        psm=tesserocr.PSM.SINGLE_LINE,
+    )
+
+
+@functools.cache
+def _row_pool() -> ThreadPoolExecutor:
+    """Shared pool for row strips; Tesseract runs outside the GIL (in-process or subprocess)."""
+    return ThreadPoolExecutor(max_workers=_ROW_WORKERS, thread_name_prefix="formbox-ocr")
 
 
-def detect_boxed_field_regions(page_image: Image.Image) -> List[Tuple[int, int, int, int]]:
+def _tile_row(rois: List[np.ndarray]) -> Tuple[np.ndarray, List[int]]:
     """
-    Detect likely boxed-grid handwriting regions (rows/strips of small boxes).
-    Works with connected grid lines common in insurance/PA forms.
-    Returns list of region bboxes (x1,y1,x2,y2).
+    Paste binarized cell crops left-to-right on one white strip.
+    Returns (strip, x offset of each cell in the strip).
     """
-    bgr = _pil_to_bgr(page_image)
-    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    H = max(r.shape[0] for r in rois) + 2 * _STRIP_MARGIN
+    W = sum(r.shape[1] for r in rois) + _STRIP_GAP * (len(rois) - 1) + 2 * _STRIP_MARGIN
+    strip = np.full((H, W), 255, dtype=np.uint8)
+    starts: List[int] = []
+    x = _STRIP_MARGIN
+    for r in rois:
+        h, w = r.shape[:2]
+        y = (H - h) // 2
+        strip[y:y + h, x:x + w] = r
+        starts.append(x)
+        x += w + _STRIP_GAP
+    return strip, starts
+
+
+def _ocr_strip_chars(strip: np.ndarray) -> List[Tuple[str, int]]:
+    """OCR a tiled row strip in one call. Returns (char, x_center) per recognized symbol."""
+    out: List[Tuple[str, int]] = []
+    api = _line_api()
+    if api is not None:
+        level = tesserocr.RIL.SYMBOL
+        api.SetImage(Image.fromarray(strip))
+        api.Recognize()
+        ri = api.GetIterator()
+        if ri is None:
+            return out
+        for r in tesserocr.iterate_level(ri, level):
+            try:
+                ch = (r.GetUTF8Text(level) or "").strip()
+            except RuntimeError:  # blank strip: the iterator has no text
+                continue
+            bb = r.BoundingBox(level)
+            if ch and bb:
+                out.append((ch, (bb[0] + bb[2]) // 2))
+        return out
+
+    # image_to_boxes: "<char> <x1> <y1> <x2> <y2> <page>" per symbol
+    for line in pytesseract.image_to_boxes(strip, config=_STRIP_CONFIG).splitlines():
+        parts = line.split(" ")
+        if len(parts) < 5 or not parts[0]:
+            continue
+        try:
+            out.append((parts[0], (int(parts[1]) + int(parts[3])) // 2))
+        except ValueError:
+            continue  # malformed box line
+    return out
+
+
+def _ocr_strips_batch(strips: List[np.ndarray]) -> List[List[Tuple[str, int]]]:
+    """
+    pytesseract fallback for many strips: a single tesseract process reads
+    every strip from a list file and emits box lines tagged with the page
+    (list) index. Returns (char, x_center) per symbol for each strip.
+    """
+    out: List[List[Tuple[str, int]]] = [[] for _ in strips]
+    with tempfile.TemporaryDirectory(prefix="formbox-") as tmp:
+        paths = []
+        for i, strip in enumerate(strips):
+            path = os.path.join(tmp, f"{i}.png")
+            Image.fromarray(strip).save(path)
+            paths.append(path)
+        list_path = os.path.join(tmp, "strips.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(paths) + "\n")
+
+        cmd = [pytesseract.pytesseract.tesseract_cmd, list_path, "stdout", *_STRIP_CONFIG.split(), "makebox"]
+        proc = subprocess.run(cmd, capture_output=True)
+        if proc.returncode != 0:
+            raise pytesseract.TesseractError(proc.returncode, proc.stderr.decode("utf-8", "replace"))
+
+    for line in proc.stdout.decode("utf-8", "replace").splitlines():
+        parts = line.split(" ")
+        if len(parts) < 6 or not parts[0]:
+            continue
+        try:
+            page = int(parts[5])
+            xc = (int(parts[1]) + int(parts[3])) // 2
+        except ValueError:
+            continue  # malformed box line
+        if 0 <= page < len(out):
+            out[page].append((parts[0], xc))
+    return out
+
+
+def _group_rows(boxes: List[Tuple[int, int, int, int]]) -> List[List[Tuple[int, int, int, int]]]:
+    """
+    Group (x, y, w, h) boxes into rows with one sweep over y-centers.
+    A box joins the current row while its y-center stays within half a
+    median box height of the row's running mean.
+    """
+    if not boxes:
+        return []
+    arr = np.asarray(boxes, dtype=np.int32)
+    ycs = arr[:, 1] + arr[:, 3] * 0.5
+    hs = arr[:, 3]
+    med_h = float(np.partition(hs, len(hs) // 2)[len(hs) // 2])
+    tol = max(4.0, med_h * 0.5)
+
+    rows: List[List[Tuple[int, int, int, int]]] = []
+    row_mean = 0.0
+    row_n = 0
+    for i in np.argsort(ycs, kind="stable").tolist():
+        yc = float(ycs[i])
+        if row_n and abs(yc - row_mean) <= tol:
+            rows[-1].append(boxes[i])
+            row_n += 1
+            row_mean += (yc - row_mean) / row_n
+        else:
+            rows.append([boxes[i]])
+            row_mean = yc
+            row_n = 1
+
+    for row in rows:
+        row.sort(key=lambda b: b[0])
+    return rows
+
+
+@functools.lru_cache(maxsize=16)
+def _rect_kernel(shape: Tuple[int, int]) -> np.ndarray:
+    """MORPH_RECT structuring element, built once per (width, height)."""
+    return cv2.getStructuringElement(cv2.MORPH_RECT, shape)
+
+
+def _pil_to_gray(img: Image.Image) -> np.ndarray:
+    # PIL's RGB->L is one native pass; no RGB/BGR intermediate copies
+    return np.asarray(img.convert("L"))
+
+
+def _grid_rects(gray: np.ndarray, factor: int) -> np.ndarray:
+    """
+    (x, y, w, h) bounding rects of ruled-line blobs, in full-resolution pixels.
+    factor > 1 runs the detection on a copy downscaled by that whole number
+    (INTER_AREA fast path), with the threshold block and line kernels scaled
+    to match; rect edges are then only accurate to about factor px.
+    """
+    h, w = gray.shape[:2]
+    if factor > 1:
+        small = cv2.resize(gray, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA)
+    else:
+        small = gray
+    block = max(3, (21 // factor) | 1)
+    k = max(3, int(round(35 / factor)))
 
     # Enhance lines
     bin_img = cv2.adaptiveThreshold(
-        gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 21, 7
+        small, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, block, 7
     )
 
     # Extract horizontal + vertical lines
-    h_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (35, 1))
-    v_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 35))
+    h_kernel = _rect_kernel((k, 1))
+    v_kernel = _rect_kernel((1, k))
     horiz = cv2.morphologyEx(bin_img, cv2.MORPH_OPEN, h_kernel, iterations=1)
     vert = cv2.morphologyEx(bin_img, cv2.MORPH_OPEN, v_kernel, iterations=1)
     grid = cv2.bitwise_or(horiz, vert)
 
     # Find large grid-like contours (rows/areas)
     contours, _ = cv2.findContours(grid, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    rects = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32).reshape(-1, 4)
+    if factor > 1:
+        rects *= factor
+    return rects
+
+
+def _region_rect_mask(rects: np.ndarray, w: int, h: int, slack: int = 0) -> np.ndarray:
+    """
+    Which rects look like boxed-field rows. slack (px) loosens every size
+    limit, for rects measured on a downscaled page.
+    """
+    cw = rects[:, 2]
+    ch = rects[:, 3]
+    keep = cw >= int(0.35 * w) - slack
+    # typical boxed rows are not very tall; allow some slack
+    keep &= (ch >= 18 - slack) & (ch <= int(0.28 * h) + slack)
+    # Reject header/footer full-width rules
+    keep &= ~((cw > int(0.95 * w) + slack) & (ch < 30 - slack))
+    return keep
+
+
+def detect_boxed_field_regions(page_image: Image.Image) -> List[Tuple[int, int, int, int]]:
+    """
+    Detect likely boxed-grid handwriting regions (rows/strips of small boxes).
+    Works with connected grid lines common in insurance/PA forms.
+    Returns list of region bboxes (x1,y1,x2,y2).
+    """
+    gray = _pil_to_gray(page_image)
     h, w = gray.shape[:2]
-    regions: List[Tuple[int,int,int,int]] = []
-    for c in contours:
-        x, y, cw, ch = cv2.boundingRect(c)
-        if cw < int(0.35 * w):
-            continue
-        # typical boxed rows are not very tall; allow some slack
-        if ch < 18 or ch > int(0.28 * h):
-            continue
-        # Reject header/footer full-width rules
-        if cw > int(0.95 * w) and ch < 30:
-            continue
 
-        pad = 6
-        x1 = max(0, x - pad)
-        y1 = max(0, y - pad)
-        x2 = min(w, x + cw + pad)
-        y2 = min(h, y + ch + pad)
-        regions.append((x1, y1, x2, y2))
+    # Most pages have no boxed fields. A downscaled pass (threshold + morphology
+    # cost is linear in pixels) with loosened size limits only decides whether
+    # there is anything to find; the regions themselves, which become the OCR
+    # crops, always come from the full-resolution pass.
+    factor = max(1, int(round(max(h, w) / float(_REGION_DETECT_MAX_SIDE))))
+    if factor > 1:
+        coarse = _grid_rects(gray, factor)
+        if not _region_rect_mask(coarse, w, h, slack=4 * factor).any():
+            return []
+
+    rects = _grid_rects(gray, 1)
+    if rects.size == 0:
+        return []
+    rects = rects[_region_rect_mask(rects, w, h)]
+
+    pad = 6
+    x1 = np.maximum(0, rects[:, 0] - pad)
+    y1 = np.maximum(0, rects[:, 1] - pad)
+    x2 = np.minimum(w, rects[:, 0] + rects[:, 2] + pad)
+    y2 = np.minimum(h, rects[:, 1] + rects[:, 3] + pad)
+    regions: List[Tuple[int,int,int,int]] = list(zip(x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist()))
 
     # Merge overlapping regions vertically (same form section)
     regions = sorted(regions, key=lambda r: (r[1], r[0]))
@@ -86,15 +288,25 @@ def detect_boxed_field_regions(page_image: Image.Image) -> List[Tuple[int, int,
     return merged[:20]
 
 
-def ocr_boxed_region(page_image: Image.Image, region_bbox: Tuple[int,int,int,int]) -> BoxLineResult:
+def ocr_boxed_region(
+    page_image: Image.Image,
+    region_bbox: Tuple[int,int,int,int],
+    *,
+    page_gray: Optional[np.ndarray] = None,
+) -> BoxLineResult:
     """
     OCR a boxed-grid region. Uses existing extract_form_box_text on cropped region.
     Returns BoxLineResult with .text and .bbox (for orchestrator).
+
+    When OCRing several regions of one page, pass `page_gray` (the page decoded
+    to a gray array once); each region is then a zero-copy slice of it.
     """
     x1,y1,x2,y2 = region_bbox
-    crop = page_image.crop((x1,y1,x2,y2))
-    bgr = _pil_to_bgr(crop)
-    out = extract_form_box_text(bgr)
+    if page_gray is not None:
+        gray = page_gray[y1:y2, x1:x2]
+    else:
+        gray = np.asarray(page_image.crop((x1,y1,x2,y2)).convert("L"))
+    out = extract_form_box_text(gray)
     txt = (out.get("text") or "").strip()
     conf = float(out.get("confidence") or 0.0) if isinstance(out.get("confidence"), (int,float)) else 0.0
     boxes = out.get("boxes") if isinstance(out.get("boxes"), list) else None
@@ -106,6 +318,7 @@ def ocr_boxed_region(page_image: Image.Image, region_bbox: Tuple[int,int,int,int
 def extract_form_box_text(image_bgr: np.ndarray) -> Dict[str, Any]:
     """
     Extract text from boxed (grid-based) handwritten form fields.
+    Accepts a BGR image or an already-gray (2-D) array.
     Returns:
       {
         "text": str,
@@ -114,7 +327,7 @@ def extract_form_box_text(image_bgr: np.ndarray) -> Dict[str, Any]:
       }
     """
 
-    gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
+    gray = image_bgr if image_bgr.ndim == 2 else cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
 
     # 1. Detect grid lines (actual boxes)
     bin_img = cv2.adaptiveThreshold(
@@ -124,59 +337,100 @@ def extract_form_box_text(image_bgr: np.ndarray) -> Dict[str, Any]:
         15, 3
     )
 
-    kernel_h = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 1))
-    kernel_v = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 25))
+    kernel_h = _rect_kernel((25, 1))
+    kernel_v = _rect_kernel((1, 25))
 
     horiz = cv2.morphologyEx(bin_img, cv2.MORPH_OPEN, kernel_h)
     vert = cv2.morphologyEx(bin_img, cv2.MORPH_OPEN, kernel_v)
 
-    grid = cv2.add(horiz, vert)
+    grid = cv2.bitwise_or(horiz, vert)
 
     # 2. Find box contours from grid
     contours, _ = cv2.findContours(grid, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-    boxes = []
     H, W = gray.shape
+    if len(contours) < 4:
+        return {"form_box_region": False}
 
-    for c in contours:
-        x, y, w, h = cv2.boundingRect(c)
-        if w < 15 or h < 15:
-            continue
-        if w > W * 0.2 or h > H * 0.15:
-            continue
-        boxes.append((x, y, w, h))
+    rects = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32).reshape(-1, 4)
+    bw = rects[:, 2]
+    bh = rects[:, 3]
+    keep = (bw >= 15) & (bh >= 15) & (bw <= W * 0.2) & (bh <= H * 0.15)
+    boxes = [tuple(r) for r in rects[keep].tolist()]
 
     if len(boxes) < 4:
         return {"form_box_region": False}
 
-    # 3. Sort boxes left-to-right, top-to-bottom
-    boxes = sorted(boxes, key=lambda b: (b[1] // 20, b[0]))
+    # 3. Split boxes into rows (top-to-bottom), each row left-to-right
+    rows = _group_rows(boxes)
 
     chars = []
     text_out = ""
 
-    for (x, y, w, h) in boxes:
-        pad = 2
-        roi = gray[y+pad:y+h-pad, x+pad:x+w-pad]
-        if roi.size == 0:
-            continue
-
-        roi = cv2.resize(roi, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-        _, roi_bin = cv2.threshold(roi, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-
-        char = pytesseract.image_to_string(
-            roi_bin,
-            config="--psm 10 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
-        ).strip()
-
-        if len(char) == 1:
-            text_out += char
-            chars.append({
-                "char": char,
-                "bbox": [x, y, x + w, y + h]
-            })
-        else:
-            text_out += " "
+    # 4. Tile each row's cells into a strip and map recognized symbols back to
+    #    cells by x offset. Rows OCR concurrently in-process (tesserocr) or in
+    #    one batched tesseract run (pytesseract fallback).
+    row_cells = []
+    for row in rows:
+        cells = []
+        for (x, y, w, h) in row:
+            pad = 2
+            roi = gray[y+pad:y+h-pad, x+pad:x+w-pad]
+            if roi.size == 0:
+                continue
+            # Blank cell: almost no ink inside the box border, skip Tesseract
+            inset = max(pad, min(w, h) // 8)
+            core = bin_img[y+inset:y+h-inset, x+inset:x+w-inset]
+            if cv2.countNonZero(core) < 0.02 * roi.size:
+                cells.append(((x, y, w, h), None))
+                continue
+
+            rh = roi.shape[0]
+            if rh < _CELL_TARGET_PX:
+                f = _CELL_TARGET_PX / float(rh)
+                roi = cv2.resize(roi, None, fx=f, fy=f, interpolation=cv2.INTER_LINEAR)
+            _, roi_bin = cv2.threshold(roi, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            cells.append(((x, y, w, h), roi_bin))
+        if cells:
+            row_cells.append(cells)
+
+    # Blank cells never reach Tesseract; rows with no inked cells get no strip
+    row_inked = [[i for i, (_, roi_bin) in enumerate(cells) if roi_bin is not None] for cells in row_cells]
+    strips = [
+        _tile_row([cells[i][1] for i in inked]) if inked else None
+        for cells, inked in zip(row_cells, row_inked)
+    ]
+    todo = [strip for strip, _ in filter(None, strips)]
+    batch = None
+    if len(todo) > 1 and not tesserocr_usable():
+        try:
+            batch = _ocr_strips_batch(todo)
+        except pytesseract.TesseractError:
+            batch = None  # one bad strip fails the whole run: retry strip by strip
+    if batch is not None:
+        done = iter(batch)
+    elif len(todo) > 1:
+        done = iter(list(_row_pool().map(_ocr_strip_chars, todo)))
+    else:
+        done = iter([_ocr_strip_chars(strip) for strip in todo])
+    row_symbols = [next(done) if strip is not None else [] for strip in strips]
+
+    for cells, inked, tiled, symbols in zip(row_cells, row_inked, strips, row_symbols):
+        cell_text = [""] * len(cells)
+        if tiled is not None:
+            starts = tiled[1]
+            for ch, xc in symbols:
+                cell_text[inked[max(0, bisect.bisect_right(starts, xc) - 1)]] += ch
+
+        for ((x, y, w, h), _), char in zip(cells, cell_text):
+            if len(char) == 1:
+                text_out += char
+                chars.append({
+                    "char": char,
+                    "bbox": [x, y, x + w, y + h]
+                })
+            else:
+                text_out += " "
 
     return {
         "form_box_region": True,
@@ -44,29 +44,40 @@ def detect_handwriting_block(block: Dict[str, Any]) -> Tuple[str, float, Dict[st
     - This is conservative: we only mark handwritten when multiple signals agree.
     """
 
-    words: List[Dict[str, Any]] = []
+    # Single pass over the block's words: token stats, confidences and heights
+    n_words = 0
+    n_short = 0
+    n_digit = 0
+    confs: List[float] = []
+    heights: List[float] = []
     for ln in (block.get("lines") or []):
         for w in (ln.get("words") or []):
-            if isinstance(w, dict) and (w.get("text") or "").strip():
-                words.append(w)
+            if not isinstance(w, dict):
+                continue
+            t = (w.get("text") or "").strip()
+            if not t:
+                continue
+            n_words += 1
+            if len(t) <= 2:
+                n_short += 1
+            if t.isdigit():
+                n_digit += 1
+            nc = _norm_conf(w.get("confidence"))
+            if nc is not None:
+                confs.append(nc)
+            h = _word_height(w)
+            if h is not None:
+                heights.append(h)
 
-    n_words = len(words)
     if n_words == 0:
         # Cursive/noisy handwriting often yields no tokens from Tesseract.
         # Do NOT hard-fail to 0; provide a weak signal so orchestrator can try TrOCR fallback.
         return "unknown", 0.25, {"reason": "no_words", "word_count": 0, "trocr_fallback_hint": True}
 
-    if n_words < 5:
-        confs = []
-        for w in words:
-            nc = _norm_conf(w.get("confidence"))
-            if nc is not None:
-                confs.append(nc)
-        avg_conf = (sum(confs) / len(confs)) if confs else None
-
-        toks = [(w.get("text") or "").strip() for w in words]
-        short_ratio = sum(1 for t in toks if len(t) <= 2) / n_words
+    avg_conf = (sum(confs) / len(confs)) if confs else None
+    short_ratio = n_short / n_words
 
+    if n_words < 5:
         score = 0.0
         if avg_conf is not None:
             if avg_conf <= 0.45:
@@ -85,25 +96,9 @@ def detect_handwriting_block(block: Dict[str, Any]) -> Tuple[str, float, Dict[st
             "trocr_fallback_hint": True,
         }
 
-    # confidences
-    confs = []
-    for w in words:
-        nc = _norm_conf(w.get("confidence"))
-        if nc is not None:
-            confs.append(nc)
-    avg_conf = (sum(confs) / len(confs)) if confs else None
-
-    # token statistics
-    toks = [(w.get("text") or "").strip() for w in words]
-    short_ratio = sum(1 for t in toks if len(t) <= 2) / n_words
-    digit_ratio = sum(1 for t in toks if t.isdigit()) / n_words
+    digit_ratio = n_digit / n_words
 
     # bbox / height statistics
-    heights = []
-    for w in words:
-        h = _word_height(w)
-        if h is not None:
-            heights.append(h)
     mean_h = (sum(heights) / len(heights)) if heights else None
     if heights and mean_h and mean_h > 0:
         var_h = sum((h - mean_h) ** 2 for h in heights) / len(heights)
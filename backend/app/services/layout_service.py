@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Any, Dict, List, Optional, Tuple
 import statistics
 
+import numpy as np
+
 
 def _safe_int(v: Any, default: int = 0) -> int:
+    if type(v) is int:
+        return v
     try:
         return int(float(v))
     except Exception:
@@ -33,6 +38,15 @@ def _word_bbox(w: Dict[str, Any]) -> Tuple[int, int, int, int]:
     return l, t, l + ww, t + hh
 
 
+def _words_to_soa(words: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """Parse each non-empty word's bbox once.
+    Returns (boxes, tokens): an (N, 4) int array of x1,y1,x2,y2 and the aligned word dicts.
+    """
+    tokens = [w for w in words if _clean_text(w.get("text"))]
+    boxes = np.array([_word_bbox(w) for w in tokens], dtype=np.int64).reshape(-1, 4)
+    return boxes, tokens
+
+
 def _median(values: List[float], default: float) -> float:
     values = [v for v in values if v is not None and v > 0]
     if not values:
@@ -62,6 +76,7 @@ class Line:
     top: int
     right: int
     bottom: int
+    space_thr: Optional[float] = None
 
     @property
     def height(self) -> int:
@@ -71,27 +86,32 @@ class Line:
     def center_y(self) -> float:
         return (self.top + self.bottom) / 2.0
 
+    @cached_property
+    def text(self) -> str:
+        # shared by the page-level lines and the block lines of one layout
+        return line_text_from_words(self.words, self.space_thr)
+
     def to_dict(self) -> Dict[str, Any]:
         return {
-            "text": line_text_from_words(self.words),
+            "text": self.text,
             "bbox": {"x1": self.left, "y1": self.top, "x2": self.right, "y2": self.bottom, "left": self.left, "top": self.top, "right": self.right, "bottom": self.bottom},
             "words": self.words,
         }
 
 
-def line_text_from_words(words: List[Dict[str, Any]]) -> str:
-    ws = sorted(words, key=lambda w: _safe_int(_word_bbox(w)[0]))
-    if not ws:
+def line_text_from_words(words: List[Dict[str, Any]], space_thr: Optional[float] = None) -> str:
+    # parse each word once: (bbox, text) pairs ordered by x1
+    items = sorted(((_word_bbox(w), _clean_text(w.get("text"))) for w in words), key=lambda it: it[0][0])
+    if not items:
         return ""
-    space_thr = _estimate_space_threshold(ws)
+    if space_thr is None:
+        space_thr = _estimate_space_threshold(words)
     parts: List[str] = []
     prev_r: Optional[int] = None
 
-    for w in ws:
-        txt = _clean_text(w.get("text"))
+    for (l, t, r, b), txt in items:
         if not txt:
             continue
-        l, t, r, b = _word_bbox(w)
         if prev_r is None:
             parts.append(txt)
         else:
@@ -103,44 +123,50 @@ def line_text_from_words(words: List[Dict[str, Any]]) -> str:
                 parts.append(txt)
         prev_r = r
 
-    return " ".join(" ".join(parts).split()).strip()
+    text = " ".join(parts)
+    # words are stripped; only collapse if one carries inner runs/tabs/newlines
+    # (every whitespace char except " " is non-printable)
+    if "  " in text or not text.isprintable():
+        text = " ".join(text.split())
+    return text
 
 
 def build_lines(words: List[Dict[str, Any]]) -> List[Line]:
-    tokens = [w for w in words if _clean_text(w.get("text"))]
+    boxes, tokens = _words_to_soa(words)
     if not tokens:
         return []
 
-    heights = []
-    for w in tokens:
-        l, t, r, b = _word_bbox(w)
-        heights.append(max(1, b - t))
-    med_h = _median([float(h) for h in heights], default=12.0)
+    heights = np.maximum(1, boxes[:, 3] - boxes[:, 1])
+    med_h = float(np.median(heights))
     y_tol = max(4.0, med_h * 0.6)
 
-    tokens.sort(key=lambda w: (_safe_int(_word_bbox(w)[1]), _safe_int(_word_bbox(w)[0])))
+    # Sweep words by vertical center: a word either joins the newest line or
+    # starts the next one, so no scan over earlier lines is needed.
+    cys = (boxes[:, 1] + boxes[:, 3]) / 2.0
+    order = np.lexsort((boxes[:, 0], cys))
 
+    # Lines hold word indices while grouping; swapped for dicts at the end
     lines: List[Line] = []
-    for w in tokens:
-        l, t, r, b = _word_bbox(w)
-        cy = (t + b) / 2.0
-
-        placed = False
-        for ln in lines:
-            if abs(cy - ln.center_y) <= y_tol:
-                ln.words.append(w)
-                ln.left = min(ln.left, l)
-                ln.top = min(ln.top, t)
-                ln.right = max(ln.right, r)
-                ln.bottom = max(ln.bottom, b)
-                placed = True
-                break
-
-        if not placed:
-            lines.append(Line(words=[w], left=l, top=t, right=r, bottom=b))
+    ln: Optional[Line] = None
+    for i, cy, (l, t, r, b) in zip(order.tolist(), cys[order].tolist(), boxes[order].tolist()):
+        if ln is not None and abs(cy - ln.center_y) <= y_tol:
+            ln.words.append(i)
+            ln.left = min(ln.left, l)
+            ln.top = min(ln.top, t)
+            ln.right = max(ln.right, r)
+            ln.bottom = max(ln.bottom, b)
+        else:
+            ln = Line(words=[i], left=l, top=t, right=r, bottom=b)
+            lines.append(ln)
 
+    # Per-word char width, so each line's space threshold is computed once here
+    lefts = boxes[:, 0].tolist()
+    n_chars = np.array([len(_clean_text(w.get("text"))) for w in tokens])
+    char_w = (np.maximum(1, boxes[:, 2] - boxes[:, 0]) / n_chars).tolist()
     for ln in lines:
-        ln.words.sort(key=lambda w: _safe_int(_word_bbox(w)[0]))
+        idx = sorted(ln.words, key=lefts.__getitem__)
+        ln.space_thr = _median([char_w[i] for i in idx], default=7.0) * 1.5
+        ln.words = [tokens[i] for i in idx]
     lines.sort(key=lambda ln: (ln.top, ln.left))
     return lines
 
@@ -166,7 +192,7 @@ def build_blocks(lines: List[Line]) -> List[Dict[str, Any]]:
         if not cur_lines or cur_bbox is None:
             cur_lines, cur_bbox, cur_left_anchor, prev_bottom = [], None, None, None
             return
-        texts = [line_text_from_words(ln.words) for ln in cur_lines]
+        texts = [ln.text for ln in cur_lines]
         texts = [t for t in texts if t]
         block_text = "\n".join(texts).strip()
 
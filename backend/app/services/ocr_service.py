@@ -1,16 +1,32 @@
+import functools
+import hashlib
 import io
 import os
 import platform
+import tempfile
+import threading
 import time
 import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Dict, Any, Tuple, Optional
 
+import numpy as np
 import pytesseract
 import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
 from PIL import Image, ImageOps, ImageFilter
 from docx import Document
+from lxml import etree
 from pytesseract import Output
 
+try:
+    import cv2  # type: ignore
+except Exception:
+    cv2 = None  # type: ignore
+
+from app.services.tesseract_runtime import tesserocr, tesserocr_usable, thread_api
 from app.models.schemas import OCRResponse, PageText
 from app.services import file_service
 from app.core.config import settings
@@ -68,8 +84,110 @@ def configure_tesseract():
 configure_tesseract()
 
 
+# LRU of page OCR results: image hash -> {"text", "words"}
+_OCR_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_OCR_CACHE_LOCK = threading.Lock()
+
+
+def _page_api():
+    """
+    Persistent full-page tesserocr API for the calling thread, so language data
+    is loaded once per worker (a PyTessBaseAPI must not be shared across threads).
+    Page OCR only runs on _ocr_pool threads, which caps the number of APIs
+    (and loaded models) at the pool size. Returns None when tesserocr is
+    missing or fails to init.
+    """
+    if tesserocr is None:
+        return None
+    return thread_api("page_api", lang="eng", psm=tesserocr.PSM.AUTO)
+
+
+# LRU of finished responses: "<content hash>:<ext>:<document_type>" -> OCRResponse
+_RESPONSE_CACHE: "OrderedDict[str, OCRResponse]" = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _cached_response(key: str) -> Optional[OCRResponse]:
+    """Deep copy of a cached response, so callers may modify it freely."""
+    with _RESPONSE_CACHE_LOCK:
+        hit = _RESPONSE_CACHE.get(key)
+        if hit is not None:
+            _RESPONSE_CACHE.move_to_end(key)
+    return hit.model_copy(deep=True) if hit is not None else None
+
+
+def _cache_response(key: str, response: OCRResponse) -> None:
+    stored = response.model_copy(deep=True)
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = stored
+        while len(_RESPONSE_CACHE) > settings.OCR_RESPONSE_CACHE_MAX_ENTRIES:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+def _ocr_workers() -> int:
+    return settings.OCR_CONCURRENCY or os.cpu_count() or 1
+
+
+@functools.cache
+def _ocr_pool() -> ThreadPoolExecutor:
+    """Shared pool for page OCR; pytesseract waits on a subprocess, so threads scale."""
+    return ThreadPoolExecutor(max_workers=_ocr_workers(), thread_name_prefix="page-ocr")
+
+
+# Pages per tesseract run in pytesseract list mode; tesseract is known to
+# stall on very long image lists.
+_MAX_OCR_BATCH = 40
+
+
+# ImageFilter.SHARPEN (scale 16) as an integer kernel
+_SHARPEN_KERNEL = np.array([[-2, -2, -2], [-2, 32, -2], [-2, -2, -2]], dtype=np.float32)
+
+
+def _autocontrast(gray: np.ndarray) -> np.ndarray:
+    """ImageOps.autocontrast (cutoff=0) on a uint8 array: same min/max stretch LUT."""
+    lo, hi = (int(v) for v in cv2.minMaxLoc(gray)[:2])
+    if hi <= lo:
+        return gray
+    scale = 255.0 / (hi - lo)
+    lut = np.clip((np.arange(256) * scale - lo * scale).astype(np.int64), 0, 255).astype(np.uint8)
+    return cv2.LUT(gray, lut)
+
+
+def _sharpen(gray: np.ndarray) -> np.ndarray:
+    """
+    ImageFilter.SHARPEN on a uint8 array, pixel-exact: PIL rounds half up
+    and leaves the 1px border unfiltered.
+    """
+    acc = cv2.filter2D(gray, cv2.CV_16S, _SHARPEN_KERNEL, delta=8, borderType=cv2.BORDER_REPLICATE)
+    np.right_shift(acc, 4, out=acc)
+    out = np.clip(acc, 0, 255).astype(np.uint8)
+    out[0], out[-1] = gray[0], gray[-1]
+    out[:, 0], out[:, -1] = gray[:, 0], gray[:, -1]
+    return out
+
+
+@functools.cache
+def _file_pool() -> ThreadPoolExecutor:
+    """
+    Threads for multi-file jobs. Every file shares this process's page-OCR and
+    response caches, saved-upload hashes and tesserocr APIs, and its page OCR
+    still goes through _ocr_pool (process_file waits on that pool, so it must
+    never run on it).
+    """
+    workers = min(os.cpu_count() or 1, settings.MAX_DOCS_PER_BATCH)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="file-job")
+
+
+def shutdown_file_pool() -> None:
+    """Stop the multi-file job threads, if any were started (app shutdown)."""
+    if _file_pool.cache_info().currsize:
+        _file_pool().shutdown(wait=True, cancel_futures=True)
+        _file_pool.cache_clear()
+
+
 def _preprocess(image: Image.Image) -> Image.Image:
-    image = image.convert("L")
+    if image.mode != "L":
+        image = image.convert("L")
 
     w, h = image.size
     max_side = max(w, h)
@@ -77,26 +195,156 @@ def _preprocess(image: Image.Image) -> Image.Image:
         scale = 1000 / max_side
         image = image.resize((int(w * scale), int(h * scale)), Image.LANCZOS)
 
-    image = ImageOps.autocontrast(image)
-    image = image.filter(ImageFilter.SHARPEN)
-    return image
+    if cv2 is None:
+        image = ImageOps.autocontrast(image)
+        return image.filter(ImageFilter.SHARPEN)
+
+    # Same result as autocontrast + SHARPEN, on one array (~4x faster sharpen)
+    gray = _autocontrast(np.asarray(image))
+    return Image.fromarray(_sharpen(gray))
+
+
+def _tesserocr_words(api, image: Image.Image) -> List[Dict[str, Any]]:
+    level = tesserocr.RIL.WORD
+    api.SetImage(image)
+    api.Recognize()
+    ri = api.GetIterator()
+    if ri is None:
+        return []
+
+    words: List[Dict[str, Any]] = []
+    for r in tesserocr.iterate_level(ri, level):
+        try:
+            txt = (r.GetUTF8Text(level) or "").strip()
+        except RuntimeError:  # empty page: the iterator has no text
+            continue
+        bb = r.BoundingBox(level)
+        if not txt or not bb:
+            continue
+        conf_i = float(r.Confidence(level))
+        words.append(
+            {
+                "text": txt,
+                "confidence": conf_i / 100.0 if conf_i >= 0 else None,
+                "bbox": [int(bb[0]), int(bb[1]), int(bb[2]), int(bb[3])],
+            }
+        )
+    return words
+
+
+def _image_key(image: Image.Image) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+def _copy_ocr_result(o: Dict[str, Any]) -> Dict[str, Any]:
+    return {"text": o["text"], "words": [{**w, "bbox": list(w["bbox"])} for w in o["words"]]}
+
+
+def ocr_image_words(image: Image.Image, *, cache: bool = False) -> Dict[str, Any]:
+    """OCR with word-level confidence + bbox (NO dropping).
+
+    cache=True reuses/stores the result in the in-memory OCR cache keyed by
+    the image content; callers must leave it off for zero-retention requests.
+    """
+    if not cache or settings.OCR_CACHE_MAX_ENTRIES <= 0:
+        return _ocr_image_words(image)
+
+    key = _image_key(image)
+    hit = _cache_get(key)
+    if hit is not None:
+        return hit
+
+    o = _ocr_image_words(image)
+    _cache_put(key, o)
+    return o
 
 
-def ocr_image_words(image: Image.Image) -> Dict[str, Any]:
-    """OCR with word-level confidence + bbox (NO dropping)."""
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    with _OCR_CACHE_LOCK:
+        hit = _OCR_CACHE.get(key)
+        if hit is not None:
+            _OCR_CACHE.move_to_end(key)
+    return _copy_ocr_result(hit) if hit is not None else None
+
+
+def _cache_put(key: str, o: Dict[str, Any]) -> None:
+    with _OCR_CACHE_LOCK:
+        _OCR_CACHE[key] = _copy_ocr_result(o)
+        while len(_OCR_CACHE) > settings.OCR_CACHE_MAX_ENTRIES:
+            _OCR_CACHE.popitem(last=False)
+
+
+def ocr_images_words(images: List[Image.Image], *, cache: bool = False) -> List[Dict[str, Any]]:
+    """
+    ocr_image_words for several pages. Without tesserocr, the pages that miss
+    the cache go through a single tesseract run (list mode), so the language
+    model loads once instead of once per page.
+    """
+    if len(images) == 1 or tesserocr_usable():
+        return [ocr_image_words(image, cache=cache) for image in images]
+
+    use_cache = cache and settings.OCR_CACHE_MAX_ENTRIES > 0
+    keys = [_image_key(image) for image in images] if use_cache else []
+    results: List[Optional[Dict[str, Any]]] = [_cache_get(k) for k in keys] if use_cache else [None] * len(images)
+    todo = [i for i, o in enumerate(results) if o is None]
+
+    if len(todo) > 1:
+        try:
+            done = _ocr_images_batch([images[i] for i in todo])
+        except pytesseract.TesseractError:
+            done = [_ocr_image_words(images[i]) for i in todo]
+    else:
+        done = [_ocr_image_words(images[i]) for i in todo]
+
+    for i, o in zip(todo, done):
+        results[i] = o
+        if use_cache:
+            _cache_put(keys[i], o)
+    return results  # type: ignore[return-value]
+
+
+def _ocr_images_batch(images: List[Image.Image]) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory(prefix="pages-") as tmp:
+        paths = []
+        for i, image in enumerate(images):
+            path = os.path.join(tmp, f"{i}.png")
+            _preprocess(image).save(path, compress_level=1)
+            paths.append(path)
+        list_path = os.path.join(tmp, "pages.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(paths) + "\n")
+
+        data = pytesseract.image_to_data(list_path, output_type=Output.DICT)
+    return _tsv_results(data, len(images))
+
+
+def _ocr_image_words(image: Image.Image) -> Dict[str, Any]:
     image = _preprocess(image)
+
+    api = _page_api()
+    if api is not None:
+        found = _tesserocr_words(api, image)
+        return {"text": " ".join(w["text"] for w in found).strip(), "words": found}
+
     data = pytesseract.image_to_data(image, output_type=Output.DICT)
+    return _tsv_results(data, 1)[0]
 
-    words: List[Dict[str, Any]] = []
-    texts: List[str] = []
 
-    n = len(data.get("text", []))
-    for i in range(n):
-        txt = (data["text"][i] or "").strip()
-        conf = data["conf"][i]
+def _tsv_results(data: Dict[str, List[Any]], n_pages: int) -> List[Dict[str, Any]]:
+    """Split image_to_data output into one {"text", "words"} result per page."""
+    page_words: List[List[Dict[str, Any]]] = [[] for _ in range(n_pages)]
 
+    columns = (data.get(k) or [] for k in ("page_num", "text", "conf", "left", "top", "width", "height"))
+    for page_num, txt, conf, left, top, width, height in zip(*columns):
+        txt = (txt or "").strip()
         if not txt:
             continue
+        page = int(page_num) - 1
+        if not 0 <= page < n_pages:
+            continue
 
         try:
             conf_i = float(conf)
@@ -104,40 +352,74 @@ def ocr_image_words(image: Image.Image) -> Dict[str, Any]:
         except Exception:
             conf_f = None
 
-        left = int(data["left"][i])
-        top = int(data["top"][i])
-        width = int(data["width"][i])
-        height = int(data["height"][i])
+        left = int(left)
+        top = int(top)
 
-        words.append(
+        page_words[page].append(
             {
                 "text": txt,
                 "confidence": conf_f,
-                "bbox": [left, top, left + width, top + height],
+                "bbox": [left, top, left + int(width), top + int(height)],
             }
         )
-        texts.append(txt)
 
-    return {"text": " ".join(texts).strip(), "words": words}
+    return [{"text": " ".join(w["text"] for w in words).strip(), "words": words} for words in page_words]
+
+
+# Lowest DPI a scanned page is rendered at, however coarse the scan itself
+_MIN_RENDER_DPI = 150
+
+
+def _scan_dpi(page) -> Optional[float]:
+    """
+    Native resolution of a scanned page: pixels of the largest image object
+    over its placed size. None unless that image covers most of the page.
+    """
+    try:
+        page_w, page_h = page.get_size()
+        best, best_area = None, 0.0
+        for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE]):
+            left, bottom, right, top = obj.get_bounds()
+            area = (right - left) * (top - bottom)
+            if area > best_area:
+                best, best_area = (obj.get_px_size(), max(right - left, top - bottom)), area
+        if best is None or best_area < 0.5 * page_w * page_h:
+            return None
+        (px_w, px_h), placed_pt = best
+        return max(px_w, px_h) * 72.0 / placed_pt
+    except Exception:
+        return None
 
 
-def extract_from_pdf(file_bytes: bytes) -> Tuple[List[PageText], List[Optional[Image.Image]]]:
+def extract_from_pdf(file_bytes: bytes, *, cache: bool = False) -> Tuple[List[PageText], List[Optional[Image.Image]]]:
     """
     Returns:
       pages: List[PageText]
       page_images: aligned list (PIL image for image-rendered pages; None for text-extracted pages)
     """
     pdf = pdfium.PdfDocument(file_bytes)
-    pages: List[PageText] = []
+    pages: List[Optional[PageText]] = []
     page_images: List[Optional[Image.Image]] = []
 
-    for i in range(len(pdf)):
+    # pdfium is not thread-safe: extract text and render on this thread, and
+    # hand rendered pages to the OCR pool so rendering overlaps OCR. Without
+    # tesserocr, pages go in groups (one tesseract run each) spread over the
+    # pool's workers.
+    n_pages = len(pdf)
+    batch_size = 1 if tesserocr_usable() else max(1, min(_MAX_OCR_BATCH, -(-n_pages // _ocr_workers())))
+    ocr = functools.partial(ocr_images_words, cache=cache)
+    pending: List[Tuple[List[int], Future]] = []
+    group: List[int] = []
+    for i in range(n_pages):
         page = pdf[i]
 
         text = ""
         try:
-            textpage = page.get_textpage()
-            text = (textpage.get_text_range() or "").strip()
+            # no text objects (scanned page): skip building a textpage
+            if next(page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_TEXT]), None) is not None:
+                textpage = page.get_textpage()
+                text = (textpage.get_text_range() or "").strip()
+                textpage.close()
         except Exception:
             text = ""
 
@@ -145,30 +427,101 @@ def extract_from_pdf(file_bytes: bytes) -> Tuple[List[PageText], List[Optional[I
             pages.append(PageText(page_number=i + 1, text=text))
             page_images.append(None)
         else:
-            scale = 300 / 72.0
+            # rendering a scan above its own resolution only adds pixels to OCR
+            dpi = settings.PDF_RENDER_DPI
+            src_dpi = _scan_dpi(page)
+            if src_dpi is not None:
+                dpi = min(dpi, max(_MIN_RENDER_DPI, src_dpi))
+            scale = dpi / 72.0
             bitmap = page.render(scale=scale)
-            pil_image = bitmap.to_pil().convert("RGB")
+            # BGR bitmap -> PIL copies into an RGB image, so the bitmap can go now
+            pil_image = bitmap.to_pil()
+            bitmap.close()
+            if pil_image.mode != "RGB":
+                pil_image = pil_image.convert("RGB")
 
-            o = ocr_image_words(pil_image)
-            pages.append(PageText(page_number=i + 1, text=o["text"], words=o["words"]))
+            pages.append(None)
             page_images.append(pil_image)
+            group.append(i)
+            if len(group) >= batch_size:
+                pending.append((group, _ocr_pool().submit(ocr, [page_images[j] for j in group])))
+                group = []
+
+    if group:
+        pending.append((group, _ocr_pool().submit(ocr, [page_images[j] for j in group])))
+
+    for group, fut in pending:
+        for i, o in zip(group, fut.result()):
+            pages[i] = PageText(page_number=i + 1, text=o["text"], words=o["words"])
 
     return pages, page_images
 
 
-def extract_from_image(file_bytes: bytes) -> Tuple[List[PageText], List[Optional[Image.Image]]]:
-    image = Image.open(io.BytesIO(file_bytes)).convert("RGB")
-    o = ocr_image_words(image)
+def extract_from_image(file_bytes: bytes, *, cache: bool = False) -> Tuple[List[PageText], List[Optional[Image.Image]]]:
+    decoded = Image.open(io.BytesIO(file_bytes))
+    decoded.load()
+    image = decoded.convert("RGB")
+    # Grayscale scans go to OCR as decoded; only the kept page image needs RGB
+    # on the OCR pool, so request threads never build their own tesserocr API
+    o = _ocr_pool().submit(ocr_image_words, decoded if decoded.mode == "L" else image, cache=cache).result()
     return [PageText(page_number=1, text=o["text"], words=o["words"])], [image]
 
 
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_RUN_TEXT = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+
+
+def _docx_run_text(run) -> str:
+    """Text of a w:r element, mirroring python-docx Run.text."""
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _W + "t":
+            parts.append(child.text or "")
+        elif tag == _W + "br":
+            if child.get(_W + "type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag in _W_RUN_TEXT:
+            parts.append(_W_RUN_TEXT[tag])
+    return "".join(parts)
+
+
+def _docx_paragraphs(file_bytes: bytes) -> List[str]:
+    """Stream top-level body paragraphs out of word/document.xml.
+
+    Same text as python-docx ``Document(...).paragraphs`` without building the
+    whole object tree; every w:p is cleared once it has been read.
+    """
+    paragraphs: List[str] = []
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as z:
+        with z.open("word/document.xml") as f:
+            for _, elem in etree.iterparse(f, tag=_W + "p", resolve_entities=False, no_network=True):
+                parent = elem.getparent()
+                if parent is not None and parent.tag == _W + "body":
+                    parts = []
+                    for child in elem:
+                        if child.tag == _W + "r":
+                            parts.append(_docx_run_text(child))
+                        elif child.tag == _W + "hyperlink":
+                            parts.extend(_docx_run_text(r) for r in child.iterchildren(_W + "r"))
+                    paragraphs.append("".join(parts))
+                elem.clear()
+    return paragraphs
+
+
 def extract_from_docx(file_bytes: bytes) -> Tuple[List[PageText], List[Optional[Image.Image]]]:
-    doc = Document(io.BytesIO(file_bytes))
-    paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-    text = "\n".join(paragraphs)
+    try:
+        paragraphs = _docx_paragraphs(file_bytes)
+    except (KeyError, zipfile.BadZipFile, etree.XMLSyntaxError):
+        # Non-standard part layout: let python-docx resolve it
+        paragraphs = [p.text for p in Document(io.BytesIO(file_bytes)).paragraphs]
+    text = "\n".join(p for p in paragraphs if p.strip())
     return [PageText(page_number=1, text=text)], [None]
 
 
+_IMAGE_EXTS = frozenset({"jpg", "jpeg", "png", "bmp", "tif", "tiff"})
+
+
 def process_file(
     file_bytes: bytes,
     filename: str,
@@ -182,19 +535,39 @@ def process_file(
     if zero_retention is None:
         zero_retention = settings.ZERO_RETENTION_DEFAULT
 
-    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    _, dot, ext = filename.rpartition(".")
+    ext = ext.lower() if dot else ""
+
+    # Same bytes, type and document_type as a recent request: reuse its result
+    content_hash: Optional[str] = None
+    response_key: Optional[str] = None
+    if not zero_retention:
+        content_hash = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+        if settings.OCR_RESPONSE_CACHE_MAX_ENTRIES > 0:
+            response_key = f"{content_hash}:{ext}:{document_type}"
+            hit = _cached_response(response_key)
+            if hit is not None:
+                file_service.save_unique_by_name(filename, file_bytes, content_hash=content_hash)
+                hit.job_id = job_id
+                hit.metadata.update(
+                    file_name=filename,
+                    processing_time_ms=int((time.time() - start) * 1000),
+                    response_cache_hit=True,
+                )
+                return hit
 
     # --- Phase 1: ingestion (plus keep images for multi-engine) ---
     if ext == "pdf":
-        pages, page_images = extract_from_pdf(file_bytes)
-    elif ext in {"jpg", "jpeg", "png", "bmp", "tif", "tiff"}:
-        pages, page_images = extract_from_image(file_bytes)
+        pages, page_images = extract_from_pdf(file_bytes, cache=not zero_retention)
+    elif ext in _IMAGE_EXTS:
+        pages, page_images = extract_from_image(file_bytes, cache=not zero_retention)
     elif ext == "docx":
         pages, page_images = extract_from_docx(file_bytes)
     else:
         raise ValueError(f"Unsupported file type: .{ext or 'unknown'}")
 
     enriched_pages: List[PageText] = []
+    page_dicts: List[Dict[str, Any]] = []  # same pages as plain dicts, for Phase 3
     page_quality: List[Dict[str, Any]] = []
 
     # --- Phase 2 + Phase 3 early (non-destructive) ---
@@ -213,12 +586,13 @@ def process_file(
 
         page_quality.append({"page": page_dict.get("page_number"), **(page_dict.get("quality") or {})})
         enriched_pages.append(PageText(**page_dict))
+        page_dicts.append(page_dict)
 
-    full_text = "\n\n".join((p.text_normalized or p.text or "") for p in enriched_pages).strip()
+    full_text = "\n\n".join([p.text_normalized or p.text or "" for p in enriched_pages]).strip()
     processing_time_ms = int((time.time() - start) * 1000)
 
     if not zero_retention:
-        file_service.save_unique_by_name(filename, file_bytes)
+        file_service.save_unique_by_name(filename, file_bytes, content_hash=content_hash)
     else:
         file_service.delete_if_exists(filename)
 
@@ -226,10 +600,13 @@ def process_file(
     avg_quality = (sum(qs) / len(qs)) if qs else None
 
     # --- Phase 3 proper: canonical document model (TOP-LEVEL) ---
-    document_model = normalize_document(
-        [p.model_dump() for p in enriched_pages],
-        full_text=full_text,
-    )
+    document_model = normalize_document(page_dicts, full_text=full_text)
+
+    # Page images are only needed by diagnostics and Phase 4; each one is
+    # dropped after its last consumer so RSS falls as the pages are done.
+    images_for_phase4 = orchestrate_page_ocr is not None
+    if compute_page_diagnostics is None and not images_for_phase4:
+        page_images = [None] * len(page_images)
 
     # --- Diagnostics v2 (non-destructive) ---
     if compute_page_diagnostics is not None and isinstance(page_images, list) and document_model is not None:
@@ -246,6 +623,8 @@ def process_file(
                 except Exception:
                     page_text = ""
                 v2_pages.append({"page_number": page_num, **compute_page_diagnostics(img, page_text)})
+                if not images_for_phase4:
+                    page_images[i] = None
             # attach
             try:
                 document_model.diagnostics.setdefault("v2", {})
@@ -257,7 +636,11 @@ def process_file(
 
     # --- Phase 4: docTR + TrOCR orchestration (OPTIONAL, safe) ---
     # Runs only if (a) orchestrator exists and (b) we have page images
-    if orchestrate_page_ocr is not None and isinstance(page_images, list) and document_model is not None:
+    if (
+        images_for_phase4
+        and isinstance(page_images, list)
+        and document_model is not None
+    ):
         try:
             dm = document_model.model_dump() if hasattr(document_model, "model_dump") else dict(document_model)
             dm_pages = dm.get("pages") or []
@@ -267,6 +650,7 @@ def process_file(
                 if img is None:
                     updated_pages.append(pg)
                     continue
+                page_images[i] = None  # last use
                 page_number = int(pg.get("page_number") or (i + 1))
                 updated_pages.append(
                     orchestrate_page_ocr(
@@ -312,7 +696,7 @@ def process_file(
     except Exception:
         pass
 
-    return OCRResponse(
+    response = OCRResponse(
         job_id=job_id,
         status="success",
         document_type=document_type,
@@ -326,9 +710,37 @@ def process_file(
             "processing_time_ms": processing_time_ms,
             "engine": "tesseract(+doctr/trocr)",
             "zero_retention": bool(zero_retention),
+            "content_hash": content_hash,
             "phase2_complete": True,
             "phase3_complete": True,
             "avg_quality_score": avg_quality,
             "page_quality": page_quality,
         },
     )
+    if response_key is not None:
+        _cache_response(response_key, response)
+    return response
+
+
+def _file_outcome(job: Tuple[bytes, str, str], zero_retention: bool | None) -> Any:
+    file_bytes, filename, document_type = job
+    try:
+        return process_file(file_bytes, filename, document_type, zero_retention=zero_retention)
+    except Exception as e:
+        return e
+
+
+def process_files(
+    jobs: List[Tuple[bytes, str, str]],
+    *,
+    zero_retention: bool | None = None,
+) -> List[Any]:
+    """
+    Run process_file for several (file_bytes, filename, document_type) jobs,
+    on job threads when there is more than one job and CPU (Tesseract runs
+    outside the GIL either way). Returns one item per job, in order: the
+    OCRResponse, or the exception it raised.
+    """
+    if len(jobs) < 2 or (os.cpu_count() or 1) < 2:
+        return [_file_outcome(job, zero_retention) for job in jobs]
+    return list(_file_pool().map(_file_outcome, jobs, [zero_retention] * len(jobs)))
@@ -1,3 +1,5 @@
+import functools
+
 from paddleocr import PaddleOCR
 import numpy as np
 from PIL import Image
@@ -36,3 +38,9 @@ class PaddleHandwritingEngine:
         except Exception as e:
             print("Paddle OCR error:", str(e))
             return ""
+
+
+@functools.cache
+def get_paddle_engine() -> PaddleHandwritingEngine:
+    """Shared engine, so the PaddleOCR models load once per process."""
+    return PaddleHandwritingEngine()
@@ -14,16 +14,17 @@ def score_page(words: List[Dict[str, Any]], text: str) -> Dict[str, Any]:
     """Heuristic scoring only (NO filtering)."""
     confs: List[float] = []
     for w in words or []:
-        c = w.get("confidence")
-        cf = _safe_float(c)
-        if cf is None:
-            continue
+        cf = w.get("confidence")
+        if type(cf) is not float:  # OCR output is already float; coerce the rest
+            cf = _safe_float(cf)
+            if cf is None:
+                continue
         # confidence in your pipeline is 0..1
         if 0.0 <= cf <= 1.0:
             confs.append(cf)
 
     avg_conf = sum(confs) / len(confs) if confs else None
-    word_count = len([w for w in (words or []) if (w.get("text") or "").strip()])
+    word_count = sum(1 for w in (words or []) if (w.get("text") or "").strip())
     char_count = len((text or "").strip())
 
     # simple quality score: blend avg_conf and text volume (log-ish)
@@ -21,8 +21,9 @@ def classify_page(words: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
     for w in (words or []):
         c = w.get("confidence")
         if isinstance(c, (int, float)):
-            if 0.0 <= float(c) <= 1.0:
-                confs.append(float(c))
+            c = float(c)
+            if 0.0 <= c <= 1.0:
+                confs.append(c)
     avg_conf = (sum(confs) / len(confs)) if confs else None
 
     short_ratio = (sum(1 for t in toks if len(t) <= 2) / n) if n else 1.0
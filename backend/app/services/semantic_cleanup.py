@@ -7,23 +7,30 @@ from typing import Dict, Any, List
 _HYPHEN_BREAK = re.compile(r"(\w)[-‐‑–](\s*)\n(\s*)(\w)")  # join hyphenated line-breaks
 _MULTI_SPACE = re.compile(r"[ \t]{2,}")
 _SPACE_BEFORE_PUNCT = re.compile(r"\s+([,.;:!?])")
+_MULTI_BLANK = re.compile(r"\n{3,}")
+_HYPHEN_BEFORE_NL = re.compile(r"[-‐‑–]\s*\n")  # cheap prefilter for _HYPHEN_BREAK
 
 
 def normalize_text(text: str) -> str:
     if not text:
         return ""
 
+    # passes that cannot match are skipped after a cheap substring check
+
     # join hyphenated line breaks: "exam-\nple" -> "example"
-    text = _HYPHEN_BREAK.sub(r"\1\4", text)
+    if _HYPHEN_BEFORE_NL.search(text):
+        text = _HYPHEN_BREAK.sub(r"\1\4", text)
 
     # normalize spaces around punctuation
     text = _SPACE_BEFORE_PUNCT.sub(r"\1", text)
 
     # normalize multiple spaces
-    text = _MULTI_SPACE.sub(" ", text)
+    if "  " in text or "\t" in text:
+        text = _MULTI_SPACE.sub(" ", text)
 
     # normalize excessive blank lines (keep max 2)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    if "\n\n\n" in text:
+        text = _MULTI_BLANK.sub("\n\n", text)
 
     return text.strip()
 
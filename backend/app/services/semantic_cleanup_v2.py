@@ -4,6 +4,7 @@ import re
 from typing import Tuple, Optional
 
 _HYPHEN_BREAK = re.compile(r"(\w)[‐‑‒–-]\s*\n\s*(\w)")
+_HYPHEN_BEFORE_NL = re.compile(r"[‐‑‒–-]\s*\n")  # cheap prefilter for _HYPHEN_BREAK
 _MULTI_SPACE = re.compile(r"[ \t]{2,}")
 _SPACE_BEFORE_PUNCT = re.compile(r"\s+([,.;:!?])")
 _TRAILING_SPACES = re.compile(r"[ \t]+\n")
@@ -28,19 +29,26 @@ def normalize_text(text: str) -> str:
     if not text:
         return ""
 
+    # Each pass is skipped when a substring check shows it cannot match;
+    # the checks are much cheaper than a regex scan over a whole page.
+
     # join hyphenated line breaks: "exam-\nple" -> "example"
-    text = _HYPHEN_BREAK.sub(r"\1\2", text)
+    if _HYPHEN_BEFORE_NL.search(text):
+        text = _HYPHEN_BREAK.sub(r"\1\2", text)
 
     # normalize spaces around punctuation
     text = _SPACE_BEFORE_PUNCT.sub(r"\1", text)
 
     # remove trailing spaces on lines
-    text = _TRAILING_SPACES.sub("\n", text)
+    if " \n" in text or "\t\n" in text:
+        text = _TRAILING_SPACES.sub("\n", text)
 
     # normalize multiple spaces
-    text = _MULTI_SPACE.sub(" ", text)
+    if "  " in text or "\t" in text:
+        text = _MULTI_SPACE.sub(" ", text)
 
     # normalize excessive blank lines
-    text = _MULTI_BLANK.sub("\n\n", text)
+    if "\n\n\n" in text:
+        text = _MULTI_BLANK.sub("\n\n", text)
 
     return text.strip()
@@ -73,19 +73,24 @@ def mark_table_candidates(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 
         x_centers.sort()
 
-        # Cluster x-centers into columns
-        clusters: List[List[int]] = []
+        # Cluster x-centers into columns (a gap > tol starts a new column);
+        # only column sizes matter, so count instead of building lists
         tol = 18
+        meaningful = 0
+        size = 0
+        prev = x_centers[0]
         for x in x_centers:
-            if not clusters or abs(x - clusters[-1][-1]) > tol:
-                clusters.append([x])
-            else:
-                clusters[-1].append(x)
-
-        meaningful = [c for c in clusters if len(c) >= 3]
+            if x - prev > tol:
+                if size >= 3:
+                    meaningful += 1
+                size = 0
+            size += 1
+            prev = x
+        if size >= 3:
+            meaningful += 1
 
         # Require at least 3 stable columns
-        if len(meaningful) >= 3:
+        if meaningful >= 3:
             b["table_candidate"] = True
 
     return blocks
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
+import heapq
 import math
 
+import numpy as np
+
 
 @dataclass
 class _Word:
@@ -35,9 +38,20 @@ def _iter_words_from_block(block: Dict[str, Any]) -> List[_Word]:
     return words
 
 
+# Above this many values a quickselect beats sorting the whole list
+_NP_MEDIAN_MIN = 1024
+
+
 def _median(nums: List[float]) -> float:
     if not nums:
         return 0.0
+    if len(nums) >= _NP_MEDIAN_MIN:
+        a = np.asarray(nums, dtype=np.float64)
+        k = a.size // 2
+        if a.size % 2 == 1:
+            return float(np.partition(a, k)[k])
+        p = np.partition(a, (k - 1, k))
+        return float((p[k - 1] + p[k]) / 2.0)
     s = sorted(nums)
     n = len(s)
     mid = n // 2
@@ -59,14 +73,27 @@ def _cluster_1d(points: List[float], tol: float) -> List[List[float]]:
     return clusters
 
 
+# Below this many points the plain loop beats NumPy's call overhead
+_NP_CLUSTER_MIN = 64
+
+
+def _cluster_centers(points: List[float], tol: float) -> List[float]:
+    """Mean of each _cluster_1d cluster, in sorted order."""
+    if len(points) < _NP_CLUSTER_MIN:
+        return [sum(c) / len(c) for c in _cluster_1d(points, tol)]
+    arr = np.sort(np.asarray(points, dtype=np.float64))
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(arr) > tol) + 1))
+    counts = np.diff(np.append(starts, arr.size))
+    return (np.add.reduceat(arr, starts) / counts).tolist()
+
+
 def _rows_from_words(words: List[_Word]) -> Tuple[List[float], float]:
     # cluster by y-center
     y_centers = [(w.y1 + w.y2) / 2.0 for w in words]
     heights = [max(1.0, (w.y2 - w.y1)) for w in words]
     med_h = max(6.0, _median(heights))
     tol = med_h * 0.6
-    clusters = _cluster_1d(y_centers, tol)
-    row_centers = [sum(c) / len(c) for c in clusters]
+    row_centers = _cluster_centers(y_centers, tol)
     return row_centers, tol
 
 
@@ -81,30 +108,26 @@ def _cols_from_words(words: List[_Word]) -> Tuple[List[float], float]:
     block_x2 = max(w.x2 for w in words)
     bw = max(200.0, float(block_x2 - block_x1))
     tol = max(med_w * 0.8, bw * 0.02)
-    clusters = _cluster_1d(x_centers, tol)
-    col_centers = [sum(c) / len(c) for c in clusters]
+    col_centers = _cluster_centers(x_centers, tol)
     return col_centers, tol
 
 
-def _nearest_index(centers: List[float], value: float) -> int:
-    best_i = 0
-    best_d = float("inf")
-    for i, c in enumerate(centers):
-        d = abs(value - c)
-        if d < best_d:
-            best_d = d
-            best_i = i
-    return best_i
+def _nearest_indices(centers: List[float], values: np.ndarray) -> np.ndarray:
+    """Index of the nearest center for every value; centers must be ascending."""
+    c = np.asarray(centers, dtype=np.float64)
+    if c.size == 1:
+        return np.zeros(values.size, dtype=np.intp)
+    right = np.clip(np.searchsorted(c, values), 1, c.size - 1)
+    left = right - 1
+    # ties go to the lower index
+    return np.where(np.abs(values - c[left]) <= np.abs(values - c[right]), left, right)
 
 
 def _bbox_union(bboxes: List[Tuple[int, int, int, int]]) -> Optional[List[int]]:
     if not bboxes:
         return None
-    x1 = min(b[0] for b in bboxes)
-    y1 = min(b[1] for b in bboxes)
-    x2 = max(b[2] for b in bboxes)
-    y2 = max(b[3] for b in bboxes)
-    return [int(x1), int(y1), int(x2), int(y2)]
+    x1s, y1s, x2s, y2s = zip(*bboxes)
+    return [int(min(x1s)), int(min(y1s)), int(max(x2s)), int(max(y2s))]
 
 
 def _score_grid(n_rows: int, n_cols: int, filled_cells: int) -> float:
@@ -165,16 +188,19 @@ def extract_tables_from_blocks(
         row_centers, _ = _rows_from_words(words)
         col_centers, _ = _cols_from_words(words)
 
+        # word centers, assigned to their nearest column/row in one go
+        xcs = np.array([(w.x1 + w.x2) / 2.0 for w in words])
+        ycs = np.array([(w.y1 + w.y2) / 2.0 for w in words])
+        col_of = _nearest_indices(col_centers, xcs)
+
         # prune extreme number of columns (often noise from scattered text)
         if len(col_centers) > max_cols:
             # keep the densest columns by counting assignments
-            counts = [0] * len(col_centers)
-            for w in words:
-                xc = (w.x1 + w.x2) / 2.0
-                counts[_nearest_index(col_centers, xc)] += 1
-            keep = sorted(range(len(col_centers)), key=lambda i: counts[i], reverse=True)[:max_cols]
+            counts = np.bincount(col_of, minlength=len(col_centers)).tolist()
+            keep = heapq.nlargest(max_cols, range(len(col_centers)), key=counts.__getitem__)
             keep = sorted(keep, key=lambda i: col_centers[i])
             col_centers = [col_centers[i] for i in keep]
+            col_of = _nearest_indices(col_centers, xcs)
 
         n_rows = len(row_centers)
         n_cols = len(col_centers)
@@ -185,21 +211,15 @@ def extract_tables_from_blocks(
         # Extra sanity: ensure we have a reasonable number of lines (rows)
         # and that columns are not created from random scattered text.
         # For UI tables: columns should have support across multiple rows.
-        col_support = [0] * n_cols
-        for w in words:
-            xc = (w.x1 + w.x2) / 2.0
-            col_support[_nearest_index(col_centers, xc)] += 1
+        col_support = np.bincount(col_of, minlength=n_cols).tolist()
         strong_cols = sum(1 for s in col_support if s >= max(3, int(n_rows * 0.8)))
         if strong_cols < min_cols:
             continue
 
         # map (r,c) -> list of words
         grid: Dict[Tuple[int, int], List[_Word]] = {}
-        for w in words:
-            yc = (w.y1 + w.y2) / 2.0
-            xc = (w.x1 + w.x2) / 2.0
-            r = _nearest_index(row_centers, yc)
-            c = _nearest_index(col_centers, xc)
+        row_of = _nearest_indices(row_centers, ycs)
+        for w, r, c in zip(words, row_of.tolist(), col_of.tolist()):
             grid.setdefault((r, c), []).append(w)
 
         # Header detection (best-effort)
@@ -210,15 +230,13 @@ def extract_tables_from_blocks(
             row1_words = [w for (r, _c), ws in grid.items() if r == 1 for w in ws]
 
             def row_stats(ws: List[_Word]) -> Tuple[int, int, float]:
-                alpha = 0
-                digit = 0
-                lens: List[int] = []
-                for ww in ws:
-                    t = ww.text
-                    alpha += sum(ch.isalpha() for ch in t)
-                    digit += sum(ch.isdigit() for ch in t)
-                    if t:
-                        lens.append(len(t))
+                texts = [ww.text for ww in ws]
+                # count over one joined string with C-level map (the joining
+                # spaces are neither alpha nor digit)
+                joined = " ".join(texts)
+                alpha = sum(map(str.isalpha, joined))
+                digit = sum(map(str.isdigit, joined))
+                lens = [len(t) for t in texts if t]
                 avg_len = (sum(lens) / len(lens)) if lens else 0.0
                 return alpha, digit, avg_len
 
@@ -245,27 +263,32 @@ def extract_tables_from_blocks(
         # - rowspan: if a cell has text and below rows are empty within same column, treat as rowspan
         visited = [[False for _ in range(n_cols)] for _ in range(n_rows)]
 
+        # next non-empty column to the right / row below each cell, filled in
+        # one backward sweep so spans are a subtraction instead of a scan
+        next_col = [[n_cols] * n_cols for _ in range(n_rows)]
+        next_row = [[n_rows] * n_cols for _ in range(n_rows)]
+        below = [n_rows] * n_cols
+        for r in range(n_rows - 1, -1, -1):
+            texts = rowcol_text[r]
+            nxt_c = next_col[r]
+            right = n_cols
+            for c in range(n_cols - 1, -1, -1):
+                nxt_c[c] = right
+                next_row[r][c] = below[c]
+                if texts[c]:
+                    right = c
+                    below[c] = r
+
         for r in range(n_rows):
             for c in range(n_cols):
                 if visited[r][c]:
                     continue
-                text = rowcol_text[r][c].strip()
+                text = rowcol_text[r][c]
                 if not text:
                     continue
 
-                # compute colspan
-                colspan = 1
-                cc = c + 1
-                while cc < n_cols and not rowcol_text[r][cc].strip():
-                    colspan += 1
-                    cc += 1
-
-                # compute rowspan
-                rowspan = 1
-                rr = r + 1
-                while rr < n_rows and not rowcol_text[rr][c].strip():
-                    rowspan += 1
-                    rr += 1
+                colspan = next_col[r][c] - c
+                rowspan = next_row[r][c] - r
 
                 # mark visited
                 for rr2 in range(r, min(n_rows, r + rowspan)):
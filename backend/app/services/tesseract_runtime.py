@@ -0,0 +1,61 @@
+"""Optional in-process Tesseract (pip install tesserocr), shared by the OCR services.
+
+Callers fall back to pytesseract when tesserocr is missing or cannot
+initialize (e.g. tessdata not found).
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+from typing import Any, Dict, Optional
+
+# One OpenMP thread per tesseract (subprocess or in-process API); pages already
+# run in parallel. Set before tesserocr loads libtesseract/libgomp, which read
+# OMP_* once at load time; pytesseract subprocesses inherit it. setdefault so
+# operators can still override it.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    import tesserocr  # type: ignore
+except Exception:
+    tesserocr = None  # type: ignore
+
+_TLS = threading.local()
+
+
+@functools.cache
+def tesserocr_usable() -> bool:
+    """
+    True when tesserocr imports AND an API actually initializes (tessdata
+    found). Decides between in-process OCR and batched pytesseract runs.
+    """
+    if tesserocr is None:
+        return False
+    try:
+        with tesserocr.PyTessBaseAPI(lang="eng"):
+            return True
+    except Exception:
+        return False
+
+
+def thread_api(name: str, variables: Optional[Dict[str, str]] = None, **kwargs: Any):
+    """
+    Persistent PyTessBaseAPI for the calling thread, one per ``name`` (model
+    loaded once per thread; a PyTessBaseAPI must not be shared across threads).
+    ``kwargs`` go to the constructor, ``variables`` to SetVariable.
+    Returns None when tesserocr is missing or fails to init.
+    """
+    api = getattr(_TLS, name, None)
+    if api is None:
+        api = False
+        if tesserocr is not None:
+            try:
+                api = tesserocr.PyTessBaseAPI(**kwargs)
+                for key, value in (variables or {}).items():
+                    api.SetVariable(key, value)
+            except Exception:
+                api = False
+        setattr(_TLS, name, api)
+    return api or None
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import threading
 from typing import List, Tuple
-from PIL import Image, ImageOps, ImageFilter
+from PIL import Image, ImageOps, ImageFilter, ImageStat
 
 try:
     import numpy as np  # type: ignore
@@ -13,6 +14,8 @@ TROCR_BUILD_ID = "TROCR_V5_BASE_BINARIZE_INVERT_LINESEG"
 _MODEL = None
 _PROCESSOR = None
 _DEVICE = None
+_DTYPE = None  # dtype of model inputs (half precision on GPU)
+_LOAD_LOCK = threading.Lock()  # startup warmup may race the first request
 
 
 def _lazy_load_trocr():
@@ -20,24 +23,54 @@ def _lazy_load_trocr():
     Load TrOCR once per process.
     Uses BASE model (~600MB) for faster downloads and stable CPU inference.
     """
-    global _MODEL, _PROCESSOR, _DEVICE
+    global _MODEL, _PROCESSOR, _DEVICE, _DTYPE
     if _MODEL is not None:
         return
+    with _LOAD_LOCK:
+        if _MODEL is not None:
+            return
+        import torch
+        from transformers import TrOCRProcessor, VisionEncoderDecoderModel
+
+        model_name = "microsoft/trocr-base-handwritten"
+
+        print(f"[{TROCR_BUILD_ID}] Using model: {model_name}")
+
+        # Use slow processor for stable behavior across transformers versions
+        processor = TrOCRProcessor.from_pretrained(model_name, use_fast=False)
+        model = VisionEncoderDecoderModel.from_pretrained(model_name)
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model.to(device)
+        model.eval()
+
+        # Reduced precision: bf16/fp16 weights on GPU, int8 dynamic quantization
+        # of the Linear layers on CPU (falls back to fp32 if unsupported)
+        dtype = torch.float32
+        if device == "cuda":
+            torch.backends.cuda.matmul.allow_tf32 = True
+            dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            model = model.to(dtype=dtype)
+            # ViT encoder runs once per image at a fixed input size: compile it
+            # (default mode; batch sizes vary, so no per-size CUDA graphs) and
+            # keep the eager encoder if compiling or a first test call fails
+            if hasattr(torch, "compile"):
+                try:
+                    compiled = torch.compile(model.encoder)
+                    size = model.config.encoder.image_size
+                    with torch.no_grad():
+                        compiled(pixel_values=torch.zeros(1, 3, size, size, device=device, dtype=dtype))
+                    model.encoder = compiled
+                except Exception as e:
+                    print(f"[{TROCR_BUILD_ID}] torch.compile unavailable, using eager encoder: {e}")
+        else:
+            try:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            except Exception as e:
+                print(f"[{TROCR_BUILD_ID}] int8 quantization unavailable, using fp32: {e}")
 
-    import torch
-    from transformers import TrOCRProcessor, VisionEncoderDecoderModel
-
-    model_name = "microsoft/trocr-base-handwritten"
-
-    print(f"[{TROCR_BUILD_ID}] Using model: {model_name}")
-
-    # Use slow processor for stable behavior across transformers versions
-    _PROCESSOR = TrOCRProcessor.from_pretrained(model_name, use_fast=False)
-    _MODEL = VisionEncoderDecoderModel.from_pretrained(model_name)
-
-    _DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-    _MODEL.to(_DEVICE)
-    _MODEL.eval()
+        _PROCESSOR, _DEVICE, _DTYPE = processor, device, dtype
+        _MODEL = model  # published last: _MODEL doubles as the "loaded" flag
 
 
 def _otsu_threshold(gray: "np.ndarray") -> int:
@@ -49,28 +82,21 @@ def _otsu_threshold(gray: "np.ndarray") -> int:
     total = gray.size
     if total == 0:
         return 128
-    sum_total = np.dot(np.arange(256), hist)
-
-    sum_b = 0.0
-    w_b = 0.0
-    max_var = -1.0
-    threshold = 128
-
-    for t in range(256):
-        w_b += hist[t]
-        if w_b == 0:
-            continue
-        w_f = total - w_b
-        if w_f == 0:
-            break
-        sum_b += t * hist[t]
+
+    # between-class variance for every threshold at once (sums are exact:
+    # integer counts in float64), first maximum wins
+    w_b = np.cumsum(hist)
+    sum_b = np.cumsum(np.arange(256) * hist)
+    w_f = total - w_b
+    valid = (w_b > 0) & (w_f > 0)
+    if not valid.any():
+        return 128
+    with np.errstate(divide="ignore", invalid="ignore"):
         m_b = sum_b / w_b
-        m_f = (sum_total - sum_b) / w_f
+        m_f = (sum_b[-1] - sum_b) / w_f
         var_between = w_b * w_f * (m_b - m_f) ** 2
-        if var_between > max_var:
-            max_var = var_between
-            threshold = t
-    return int(threshold)
+    var_between[~valid] = -1.0
+    return int(np.argmax(var_between))
 
 
 def _remove_ruling_lines_binary(bin_img: "np.ndarray") -> "np.ndarray":
@@ -80,7 +106,8 @@ def _remove_ruling_lines_binary(bin_img: "np.ndarray") -> "np.ndarray":
     """
     # bin_img: 0 = ink, 255 = background
     ink = (bin_img == 0)
-    row_ink_ratio = ink.mean(axis=1)
+    # same as ink.mean(axis=1); summing the 0/1 bytes as uint32 is ~3x faster
+    row_ink_ratio = ink.view(np.uint8).sum(axis=1, dtype=np.uint32) / ink.shape[1]
 
     # Rows with a lot of ink across width likely correspond to ruling lines.
     # Keep it deterministic.
@@ -90,13 +117,22 @@ def _remove_ruling_lines_binary(bin_img: "np.ndarray") -> "np.ndarray":
 
     out = bin_img.copy()
     ys = np.where(line_rows)[0]
-    for y in ys:
-        # only remove if the row is "thin-ish" in local neighborhood
-        y0 = max(0, y - 2)
-        y1 = min(out.shape[0], y + 3)
-        band = ink[y0:y1].mean(axis=0)
-        # replace row with background unless there's substantial vertical stroke evidence nearby
-        out[y] = np.where(band > 0.25, out[y], 255).astype(np.uint8)
+
+    # only remove if the row is "thin-ish" in local neighborhood: mean ink over
+    # rows y-2..y+2 (clipped at the edges), for all line rows at once;
+    # mean > 0.25 is tested as 4 * ink_count > n_rows on small integers
+    H = ink.shape[0]
+    band_ink = np.zeros((ys.size, ink.shape[1]), dtype=np.uint8)
+    band_rows = np.zeros(ys.size, dtype=np.uint8)
+    for dy in range(-2, 3):
+        yy = ys + dy
+        ok = (yy >= 0) & (yy < H)
+        band_ink[ok] += ink[yy[ok]]
+        band_rows += ok
+    stroke = band_ink * np.uint8(4) > band_rows[:, None]
+
+    # replace row with background unless there's substantial vertical stroke evidence nearby
+    out[ys] = np.where(stroke, out[ys], 255).astype(np.uint8)
 
     return out
 
@@ -110,12 +146,15 @@ def _preprocess(img: Image.Image) -> Image.Image:
     - Remove notebook ruling lines (binary domain)
     - Sharpen
     """
-    img = img.convert("RGB")
+    # convert() always copies, even to the same mode; grayscale input can stay
+    # single-band (resizing it gives the same pixels as via RGB at 1/3 the work)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
     w, h = img.size
     if max(w, h) < 1200:
         img = img.resize((w * 3, h * 3), Image.BICUBIC)
 
-    gray = ImageOps.grayscale(img)
+    gray = img if img.mode == "L" else ImageOps.grayscale(img)
     gray = ImageOps.autocontrast(gray, cutoff=1)
 
     if np is None:
@@ -123,9 +162,10 @@ def _preprocess(img: Image.Image) -> Image.Image:
         gray = gray.filter(ImageFilter.UnsharpMask(radius=2, percent=180, threshold=2))
         return gray.convert("RGB")
 
-    arr = np.array(gray, dtype=np.uint8)
+    arr = np.asarray(gray, dtype=np.uint8)
     t = _otsu_threshold(arr)
-    bin_img = np.where(arr > t, 255, 0).astype(np.uint8)
+    # uint8 scalars keep np.where from building an int64 image first
+    bin_img = np.where(arr > t, np.uint8(255), np.uint8(0))
 
     bin_img = _remove_ruling_lines_binary(bin_img)
 
@@ -135,6 +175,10 @@ def _preprocess(img: Image.Image) -> Image.Image:
     return pil.convert("RGB")
 
 
+# Box filter for the line-projection profile
+_SMOOTH_KERNEL = np.ones(13) / 13 if np is not None else None
+
+
 def _segment_lines(proc_rgb: Image.Image) -> List[Tuple[int, int]]:
     """
     Deterministic line segmentation using horizontal ink projection on binarized image.
@@ -142,31 +186,27 @@ def _segment_lines(proc_rgb: Image.Image) -> List[Tuple[int, int]]:
     if np is None:
         return [(0, proc_rgb.size[1])]
 
-    arr = np.array(proc_rgb.convert("L"), dtype=np.uint8)
+    arr = np.asarray(proc_rgb.convert("L"), dtype=np.uint8)
     ink = (arr < 128).astype(np.float32)  # binarized: ink=1
     proj = ink.mean(axis=1)
 
     # Smooth projection
-    k = 13
+    k = _SMOOTH_KERNEL.size
     pad = k // 2
     proj_pad = np.pad(proj, (pad, pad), mode="edge")
-    smooth = np.convolve(proj_pad, np.ones(k) / k, mode="valid")
+    smooth = np.convolve(proj_pad, _SMOOTH_KERNEL, mode="valid")
 
     thr = 0.01
     is_text = smooth > thr
 
+    # text runs from the rising/falling edges of the mask
+    edges = np.diff(is_text.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1).tolist()
+    ends = np.flatnonzero(edges == -1).tolist()
+
     segments: List[Tuple[int, int]] = []
-    y = 0
     H = len(is_text)
-    while y < H:
-        if not is_text[y]:
-            y += 1
-            continue
-        y0 = y
-        while y < H and is_text[y]:
-            y += 1
-        y1 = y
-
+    for y0, y1 in zip(starts, ends):
         # margins
         y0 = max(0, y0 - 22)
         y1 = min(H, y1 + 22)
@@ -208,17 +248,40 @@ def _score_text(s: str) -> int:
     return alpha * 6 + spaces * 2 + length - digits * 6 - noise * 10
 
 
-def _decode_line(line_img: Image.Image) -> str:
-    import torch
+# Images per generate() call; the variants of every line share batches
+_GENERATE_BATCH = 16
 
-    # decode both normal + inverted and take best score
-    variants = [line_img, ImageOps.invert(line_img.convert("L")).convert("RGB")]
+# Mean gray above which a line is decoded only as is, below which only inverted
+_LIGHT_LINE_MEAN = 200
+_DARK_LINE_MEAN = 55
 
-    best = ""
-    best_score = -10_000
 
-    for v in variants:
-        pixel_values = _PROCESSOR(images=v, return_tensors="pt").pixel_values.to(_DEVICE)
+def _decode_lines(line_imgs: List[Image.Image]) -> List[str]:
+    """
+    Decode each line normal + inverted and keep the better-scoring text
+    (only one variant for clearly light or dark lines). All variants go
+    through the model in a few batched generate() calls.
+    """
+    import torch
+
+    variants: List[Image.Image] = []
+    owners: List[int] = []  # line index of each variant
+    for li, line_img in enumerate(line_imgs):
+        gray = line_img.convert("L")
+        gmean = ImageStat.Stat(gray).mean[0]
+        # a clearly light (dark) line only decodes to garbage when inverted
+        # (as is), so that variant's generate is skipped
+        if gmean >= _DARK_LINE_MEAN:
+            variants.append(line_img)
+            owners.append(li)
+        if gmean <= _LIGHT_LINE_MEAN:
+            variants.append(ImageOps.invert(gray).convert("RGB"))
+            owners.append(li)
+
+    texts: List[str] = []
+    for i in range(0, len(variants), _GENERATE_BATCH):
+        batch = variants[i:i + _GENERATE_BATCH]
+        pixel_values = _PROCESSOR(images=batch, return_tensors="pt").pixel_values.to(_DEVICE, dtype=_DTYPE)
 
         with torch.no_grad():
             ids = _MODEL.generate(
@@ -227,37 +290,52 @@ def _decode_line(line_img: Image.Image) -> str:
                 max_new_tokens=96,
                 early_stopping=True,
             )
-        txt = _PROCESSOR.batch_decode(ids, skip_special_tokens=True)[0].strip()
+        texts.extend(t.strip() for t in _PROCESSOR.batch_decode(ids, skip_special_tokens=True))
 
+    results: List[str] = [""] * len(line_imgs)
+    best_scores: List[int] = [-10_000] * len(line_imgs)
+    for li, txt in zip(owners, texts):
         sc = _score_text(txt)
-        if sc > best_score:
-            best_score = sc
-            best = txt
-
-    return best
+        if sc > best_scores[li]:
+            best_scores[li] = sc
+            results[li] = txt
+    return results
 
 
 def trocr_ocr_crops(page_image: Image.Image, crops: List[Tuple[int, int, int, int]]) -> List[str]:
     """
     OCR each crop using TrOCR.
-    For multi-line handwriting, runs deterministic line segmentation and decodes line-by-line.
+    For multi-line handwriting, runs deterministic line segmentation and decodes line-by-line
+    (lines of all crops are decoded together in batches).
     """
     _lazy_load_trocr()
 
-    results: List[str] = []
+    line_imgs: List[Image.Image] = []
+    line_counts: List[int] = []
     for (x1, y1, x2, y2) in crops:
         crop = page_image.crop((x1, y1, x2, y2))
         proc = _preprocess(crop)
 
         lines = _segment_lines(proc)
-
-        out_lines: List[str] = []
         for (ly0, ly1) in lines:
-            line_img = proc.crop((0, ly0, proc.size[0], ly1))
-            txt = _decode_line(line_img)
-            if txt:
-                out_lines.append(txt)
+            line_imgs.append(proc.crop((0, ly0, proc.size[0], ly1)))
+        line_counts.append(len(lines))
 
+    decoded = iter(_decode_lines(line_imgs))
+
+    results: List[str] = []
+    for n in line_counts:
+        out_lines = [txt for txt in (next(decoded) for _ in range(n)) if txt]
         results.append("\n".join(out_lines).strip())
 
     return results
+
+
+def warmup_trocr() -> None:
+    """
+    Load the model and decode one blank line, so the first request does not
+    pay for weight loading (or, on CUDA, encoder compilation) inside its
+    engine timeout.
+    """
+    _lazy_load_trocr()
+    _decode_lines([Image.new("RGB", (384, 64), "white")])
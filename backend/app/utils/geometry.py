@@ -17,23 +17,49 @@ from __future__ import annotations
 
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
+
+# below this many boxes the tuple-key sort beats building numpy arrays
+_NP_SORT_MIN = 4096
+
 
 def sort_boxes_reading_order(boxes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Sort boxes by reading order using canonical bbox list/tuple at boxes[i]['bbox']."""
-    return sorted(boxes, key=lambda b: (b["bbox"][1], b["bbox"][0]))
+    n = len(boxes)
+    if n < _NP_SORT_MIN:
+        return sorted(boxes, key=lambda b: (b["bbox"][1], b["bbox"][0]))
+    ys = np.fromiter((b["bbox"][1] for b in boxes), dtype=np.float64, count=n)
+    xs = np.fromiter((b["bbox"][0] for b in boxes), dtype=np.float64, count=n)
+    # lexsort is stable and keys on the last array first: y, then x
+    return [boxes[i] for i in np.lexsort((xs, ys)).tolist()]
 
 
 def merge_boxes(boxes: List[Dict[str, Any]]) -> List[int]:
     """Merge list of boxes that contain bbox list/tuple into one bbox list."""
-    x1 = min(b["bbox"][0] for b in boxes)
-    y1 = min(b["bbox"][1] for b in boxes)
-    x2 = max(b["bbox"][2] for b in boxes)
-    y2 = max(b["bbox"][3] for b in boxes)
-    return [int(x1), int(y1), int(x2), int(y2)]
+    # one transpose, then C-level min/max per coordinate
+    x1s, y1s, x2s, y2s = zip(*(b["bbox"] for b in boxes))
+    return [int(min(x1s)), int(min(y1s)), int(max(x2s)), int(max(y2s))]
 
 
 def bbox_to_tuple(bbox: Any) -> Optional[Tuple[int, int, int, int]]:
     """Best-effort conversion to (x1,y1,x2,y2). Returns None if not possible."""
+    # fast paths: the pipeline overwhelmingly emits canonical {x1,y1,x2,y2}
+    # dicts, then [x1,y1,x2,y2] lists; exact type checks skip the MRO walk,
+    # and a missing key falls through to the general shapes below
+    cls = type(bbox)
+    if cls is dict:
+        try:
+            return (int(float(bbox["x1"])), int(float(bbox["y1"])), int(float(bbox["x2"])), int(float(bbox["y2"])))
+        except KeyError:
+            pass
+        except Exception:
+            return None
+    elif (cls is list or cls is tuple) and len(bbox) == 4:
+        try:
+            return (int(float(bbox[0])), int(float(bbox[1])), int(float(bbox[2])), int(float(bbox[3])))
+        except Exception:
+            return None
+
     try:
         if isinstance(bbox, dict):
             # canonical
@@ -2,9 +2,20 @@ import base64
 from io import BytesIO
 from PIL import Image
 
-def pil_to_data_url(img: Image.Image, format: str = "PNG") -> tuple[str, int, int]:
+def pil_to_data_url(img: Image.Image, format: str = "PNG", fast: bool = False) -> tuple[str, int, int]:
+    """
+    fast=True trades size/fidelity for encode speed (previews): lossy WebP
+    at its quickest setting instead of the requested format.
+    """
+    if fast:
+        format = "WEBP"
     buf = BytesIO()
-    img.save(buf, format=format)
-    b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
+    if fast:
+        img.save(buf, format=format, quality=80, method=0)
+    else:
+        img.save(buf, format=format)
+    # encode straight from the buffer, without a bytes copy of the image
+    with buf.getbuffer() as view:
+        b64 = base64.b64encode(view).decode("ascii")
     data_url = f"data:image/{format.lower()};base64,{b64}"
     return data_url, img.size[0], img.size[1]
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# make `app` importable when pytest runs from backend/ or the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,50 @@
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services import form_box_ocr
+
+
+def _boxed_form(size, rows):
+    """Page with rows of connected (box side, line width, gray) boxes and one full-width rule."""
+    w, h = size
+    im = Image.new("L", size, 245)
+    d = ImageDraw.Draw(im)
+    d.line((40, 60, w - 40, 60), fill=40, width=3)
+    y = 150
+    for box, lw, gray in rows:
+        for i in range(30):
+            x = 120 + i * box
+            if x + box > w - 40:
+                break
+            d.rectangle((x, y, x + box, y + box), outline=gray, width=lw)
+        d.text((120, y + box + 12), "Printed label under the boxes", fill=0)
+        y += box + 90
+    return im
+
+
+FORMS = [
+    ((2480, 3508), [(44, 2, 0), (36, 1, 60), (60, 3, 20), (22, 1, 90)]),
+    ((2480, 3508), [(35, 1, 100), (34, 1, 110), (18, 1, 80)]),
+    ((3300, 2550), [(50, 2, 30), (28, 1, 70)]),
+    ((1700, 2200), [(40, 1, 50), (24, 2, 0)]),
+]
+
+
+def _full_resolution(monkeypatch, image):
+    with monkeypatch.context() as m:
+        m.setattr(form_box_ocr, "_REGION_DETECT_MAX_SIDE", 10**9)
+        return form_box_ocr.detect_boxed_field_regions(image)
+
+
+@pytest.mark.parametrize("size,rows", FORMS)
+def test_regions_match_full_resolution(monkeypatch, size, rows):
+    image = _boxed_form(size, rows)
+    expected = _full_resolution(monkeypatch, image)
+    assert expected, "fixture should contain boxed regions"
+    assert form_box_ocr.detect_boxed_field_regions(image) == expected
+
+
+def test_blank_page_has_no_regions(monkeypatch):
+    image = Image.new("L", (2480, 3508), 255)
+    assert form_box_ocr.detect_boxed_field_regions(image) == []
+    assert _full_resolution(monkeypatch, image) == []